@@ -0,0 +1,100 @@
+import math
+from io import BytesIO
+
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .category_assets import CategoryAssetBuilder
+from .models import LearnItem
+
+ATLAS_DIR = "atlases"
+ATLAS_TILE_SIZE = 128
+ATLAS_FORMAT = ("WEBP", {"quality": 85, "method": 4})
+
+
+def _tile_source(item, tile_size):
+    # The smallest derivative that still covers a tile decodes far faster
+    # than the original upload.
+    candidates = [
+        entry
+        for entry in (item.object_image_variants or {}).get("variants", [])
+        if entry["format"] == "webp" and entry["width"] >= tile_size
+    ]
+    if candidates:
+        return min(candidates, key=lambda entry: entry["width"])["name"]
+    return item.object_image.name
+
+
+def render_tile(item, tile_size) -> Image.Image:
+    if not item.object_image:
+        return Image.new("RGBA", (tile_size, tile_size), item.object_color)
+    with default_storage.open(_tile_source(item, tile_size), "rb") as stored:
+        with Image.open(stored) as source:
+            image = ImageOps.exif_transpose(source).convert("RGBA")
+    image.thumbnail((tile_size, tile_size), Image.Resampling.LANCZOS)
+    return image
+
+
+class AtlasBuilder(CategoryAssetBuilder):
+    asset_dir = ATLAS_DIR
+    map_filename = "atlas.json"
+    file_extension = "webp"
+
+    def __init__(self, force=False, tile_size=ATLAS_TILE_SIZE):
+        super().__init__(force=force)
+        self.tile_size = tile_size
+
+    def _previous_atlas(self, previous):
+        if not previous or previous["tile"] != self.tile_size or self.force:
+            return None
+        if not default_storage.exists(previous["file"]):
+            return None
+        with default_storage.open(previous["file"], "rb") as stored:
+            with Image.open(stored) as image:
+                return image.convert("RGBA")
+
+    def build_category(self, category, previous=None) -> dict:
+        items = [
+            item
+            for item in LearnItem.objects.filter(category=category).order_by("order", "id")
+            if item.object_image or item.object_color
+        ]
+        tile = self.tile_size
+        columns = max(1, math.ceil(math.sqrt(len(items))))
+        rows = max(1, math.ceil(len(items) / columns))
+        atlas = Image.new("RGBA", (columns * tile, rows * tile), (0, 0, 0, 0))
+
+        old_atlas = self._previous_atlas(previous)
+        old_items = previous["items"] if old_atlas else {}
+        entries = {}
+        for index, item in enumerate(items):
+            old = old_items.get(str(item.pk))
+            if old and old["version"] == item.version:
+                box = (old["x"], old["y"], old["x"] + old["w"], old["y"] + old["h"])
+                image = old_atlas.crop(box)
+            else:
+                image = render_tile(item, tile)
+            x = (index % columns) * tile + (tile - image.width) // 2
+            y = (index // columns) * tile + (tile - image.height) // 2
+            atlas.paste(image, (x, y))
+            entries[str(item.pk)] = {
+                "x": x,
+                "y": y,
+                "w": image.width,
+                "h": image.height,
+                "version": item.version,
+            }
+
+        buffer = BytesIO()
+        image_format, options = ATLAS_FORMAT
+        atlas.save(buffer, format=image_format, **options)
+        name, digest = self.write_file(category, buffer.getvalue())
+        return {
+            "file": name,
+            "url": default_storage.url(name),
+            "hash": digest,
+            "width": atlas.width,
+            "height": atlas.height,
+            "tile": tile,
+            "items": entries,
+        }
@@ -0,0 +1,71 @@
+import hashlib
+
+from django.core.files.storage import default_storage
+
+from .category_assets import CategoryAssetBuilder
+from .models import LearnItem
+
+AUDIO_BUNDLE_DIR = "audio_bundles"
+
+
+class AudioBundleBuilder(CategoryAssetBuilder):
+    asset_dir = AUDIO_BUNDLE_DIR
+    map_filename = "bundle.json"
+    file_extension = "bin"
+
+    def _items(self, category):
+        return (
+            LearnItem.objects.filter(category=category)
+            .exclude(audio__isnull=True)
+            .exclude(audio="")
+            .order_by("order", "id")
+        )
+
+    def get_stamp(self, category) -> str:
+        # Only the audio content and its order matter here; renaming an item
+        # must not rebuild the bundle.
+        parts = [
+            (item.pk, (item.audio_metadata or {}).get("sha256") or item.audio.name)
+            for item in self._items(category)
+        ]
+        return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+    def _previous_content(self, previous):
+        if not previous or self.force or not default_storage.exists(previous["file"]):
+            return None, {}
+        with default_storage.open(previous["file"], "rb") as stored:
+            content = stored.read()
+        by_hash = {entry["sha256"]: entry for entry in previous["items"].values()}
+        return content, by_hash
+
+    def build_category(self, category, previous=None) -> dict:
+        old_content, old_entries = self._previous_content(previous)
+        chunks = []
+        entries = {}
+        offset = 0
+        for item in self._items(category):
+            metadata = item.audio_metadata or {}
+            old = old_entries.get(metadata.get("sha256"))
+            if old is not None:
+                data = old_content[old["offset"] : old["offset"] + old["length"]]
+            else:
+                with default_storage.open(item.audio.name, "rb") as stored:
+                    data = stored.read()
+            chunks.append(data)
+            entries[str(item.pk)] = {
+                "offset": offset,
+                "length": len(data),
+                "duration": metadata.get("duration"),
+                "content_type": metadata.get("content_type"),
+                "sha256": metadata.get("sha256") or hashlib.sha256(data).hexdigest(),
+            }
+            offset += len(data)
+
+        name, digest = self.write_file(category, b"".join(chunks))
+        return {
+            "file": name,
+            "url": default_storage.url(name),
+            "hash": digest,
+            "size": offset,
+            "items": entries,
+        }
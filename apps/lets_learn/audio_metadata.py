@@ -0,0 +1,164 @@
+import hashlib
+import mimetypes
+import struct
+import wave
+from io import BytesIO
+
+from .derivatives import commit_field_file
+
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+# Bitrates in kbps, indexed by [version is MPEG-1][layer][bitrate index].
+_MP3_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_MAX_FRAME_SCAN = 200_000
+
+
+def _mp3_frame(data, offset):
+    if offset + 4 > len(data):
+        return None
+    header = struct.unpack(">I", data[offset : offset + 4])[0]
+    if header & 0xFFE00000 != 0xFFE00000:
+        return None
+    version_bits = (header >> 19) & 3
+    layer = 4 - ((header >> 17) & 3)
+    bitrate_index = (header >> 12) & 0xF
+    rate_index = (header >> 10) & 3
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version_bits == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][rate_index]
+    padding = (header >> 9) & 1
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or mpeg1 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+    mono = (header >> 6) & 3 == 3
+    return {
+        "mpeg1": mpeg1,
+        "mono": mono,
+        "samples": samples,
+        "sample_rate": sample_rate,
+        "length": length,
+    }
+
+
+def _mp3_duration(data):
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = 0
+        for byte in data[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        offset = 10 + size + (10 if data[5] & 0x10 else 0)
+    while offset < len(data) - 4 and _mp3_frame(data, offset) is None:
+        offset += 1
+    first = _mp3_frame(data, offset)
+    if first is None:
+        return None
+
+    # A Xing/Info or VBRI header in the first frame carries the frame count.
+    side_info = (17 if first["mono"] else 32) if first["mpeg1"] else (9 if first["mono"] else 17)
+    xing = offset + 4 + side_info
+    if data[xing : xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[xing + 4 : xing + 8])[0]
+        if flags & 1:
+            frames = struct.unpack(">I", data[xing + 8 : xing + 12])[0]
+            return frames * first["samples"] / first["sample_rate"]
+    vbri = offset + 36
+    if data[vbri : vbri + 4] == b"VBRI":
+        frames = struct.unpack(">I", data[vbri + 14 : vbri + 18])[0]
+        return frames * first["samples"] / first["sample_rate"]
+
+    samples = 0
+    frames = 0
+    frame = first
+    while frame is not None and frames < _MAX_FRAME_SCAN:
+        samples += frame["samples"]
+        frames += 1
+        offset += frame["length"]
+        frame = _mp3_frame(data, offset)
+    return samples / first["sample_rate"]
+
+
+def _wav_duration(data):
+    try:
+        with wave.open(BytesIO(data)) as reader:
+            return reader.getnframes() / reader.getframerate()
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
+
+
+def _mutagen_duration(data):
+    if mutagen is None:
+        return None
+    try:
+        parsed = mutagen.File(BytesIO(data))
+    except Exception:
+        return None
+    if parsed is None or not getattr(parsed.info, "length", None):
+        return None
+    return parsed.info.length
+
+
+def sniff_audio_type(data, name="") -> str:
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "audio/wav"
+    if data[:4] == b"OggS":
+        return "audio/ogg"
+    if data[:4] == b"fLaC":
+        return "audio/flac"
+    if data[:3] == b"ID3" or _mp3_frame(data, 0) is not None:
+        return "audio/mpeg"
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def probe_audio(data, name="") -> dict:
+    content_type = sniff_audio_type(data, name)
+    duration = None
+    if content_type == "audio/wav":
+        duration = _wav_duration(data)
+    elif content_type == "audio/mpeg":
+        try:
+            duration = _mp3_duration(data)
+        except struct.error:
+            # A Xing/Info or VBRI header cut short by a truncated upload.
+            duration = None
+    if duration is None:
+        duration = _mutagen_duration(data)
+    return {
+        "duration": round(duration, 3) if duration is not None else None,
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "content_type": content_type,
+    }
+
+
+def audio_metadata_current(metadata, source_name) -> bool:
+    if not source_name:
+        return not metadata
+    return bool(metadata) and metadata.get("source") == source_name
+
+
+def read_audio_metadata(field_file) -> dict:
+    if not field_file:
+        return {}
+    commit_field_file(field_file)
+    try:
+        with field_file.storage.open(field_file.name, "rb") as stored:
+            data = stored.read()
+    except OSError:
+        return {"source": field_file.name}
+    return {"source": field_file.name, **probe_audio(data, field_file.name)}
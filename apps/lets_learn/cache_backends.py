@@ -0,0 +1,153 @@
+import pickle
+import threading
+import zlib
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+DEFAULT_MIN_COMPRESS_LENGTH = 512
+DEFAULT_COMPRESS_LEVEL = 6
+DEFAULT_STATS_FLUSH_EVERY = 100
+STATS_HITS_KEY = "cache-stats:hits"
+STATS_MISSES_KEY = "cache-stats:misses"
+
+_RAW = b"r"
+_ZLIB = b"z"
+_BYTES = b"b"
+_MISSING = object()
+
+
+def encode_value(value, min_length=DEFAULT_MIN_COMPRESS_LENGTH, level=DEFAULT_COMPRESS_LEVEL):
+    # Integers stay raw so incr/decr remain native (atomic on Redis).
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    # Bytes are stored as they are: cached bodies and images are mostly
+    # compressed already, and zlib would only cost time on every read.
+    if isinstance(value, bytes):
+        return _BYTES + value
+    data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    if len(data) >= min_length:
+        return _ZLIB + zlib.compress(data, level)
+    return _RAW + data
+
+
+def decode_value(stored):
+    if not isinstance(stored, bytes):
+        return stored
+    marker, data = stored[:1], stored[1:]
+    if marker == _BYTES:
+        return data
+    if marker == _ZLIB:
+        data = zlib.decompress(data)
+    return pickle.loads(data)
+
+
+class CompressedStatsCache(BaseCache):
+    def __init__(self, location, params):
+        options = dict(params.get("OPTIONS", {}))
+        backend = options.pop("BACKEND")
+        inner_params = {
+            key: value
+            for key, value in params.items()
+            if key in {"TIMEOUT", "KEY_PREFIX", "VERSION", "KEY_FUNCTION"}
+        }
+        inner_params["OPTIONS"] = options.pop("BACKEND_OPTIONS", {})
+        self.min_compress_length = options.pop(
+            "MIN_COMPRESS_LENGTH", DEFAULT_MIN_COMPRESS_LENGTH
+        )
+        self.compress_level = options.pop("COMPRESS_LEVEL", DEFAULT_COMPRESS_LEVEL)
+        self.stats_flush_every = options.pop(
+            "STATS_FLUSH_EVERY", DEFAULT_STATS_FLUSH_EVERY
+        )
+        super().__init__({**params, "OPTIONS": options})
+        self._cache = import_string(backend)(location, inner_params)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _encode(self, value):
+        return encode_value(value, self.min_compress_length, self.compress_level)
+
+    def _record(self, hits=0, misses=0):
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+            if self._hits + self._misses < self.stats_flush_every:
+                return
+            hits, misses = self._hits, self._misses
+            self._hits = self._misses = 0
+        self._add_to_counter(STATS_HITS_KEY, hits)
+        self._add_to_counter(STATS_MISSES_KEY, misses)
+
+    def _add_to_counter(self, key, delta):
+        if not delta:
+            return
+        try:
+            self._cache.incr(key, delta)
+        except ValueError:
+            if not self._cache.add(key, delta, timeout=None):
+                self._cache.incr(key, delta)
+        # Non-native incr (file, db) rewrites the key with the default timeout.
+        self._cache.touch(key, None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            local_hits, local_misses = self._hits, self._misses
+        hits = (self._cache.get(STATS_HITS_KEY) or 0) + local_hits
+        misses = (self._cache.get(STATS_MISSES_KEY) or 0) + local_misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else None,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits = self._misses = 0
+        self._cache.delete_many([STATS_HITS_KEY, STATS_MISSES_KEY])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.add(key, self._encode(value), timeout, version)
+
+    def get(self, key, default=None, version=None):
+        stored = self._cache.get(key, _MISSING, version)
+        if stored is _MISSING:
+            self._record(misses=1)
+            return default
+        self._record(hits=1)
+        return decode_value(stored)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._cache.set(key, self._encode(value), timeout, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        return self._cache.delete(key, version)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = self._cache.get_many(keys, version)
+        self._record(hits=len(found), misses=len(keys) - len(found))
+        return {key: decode_value(stored) for key, stored in found.items()}
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        encoded = {key: self._encode(value) for key, value in data.items()}
+        return self._cache.set_many(encoded, timeout, version)
+
+    def delete_many(self, keys, version=None):
+        return self._cache.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return self._cache.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        return self._cache.incr(key, delta, version)
+
+    def clear(self):
+        return self._cache.clear()
+
+    def close(self, **kwargs):
+        return self._cache.close(**kwargs)
@@ -0,0 +1,314 @@
+import hashlib
+import random
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .compression import (
+    apply_encoding,
+    choose_encoding,
+    compress_body,
+    set_content_encoding,
+)
+from .counters import shared_counters
+from .services import request_lang
+
+CATALOGUE_SCOPE = "categories"
+ALL_ITEMS_SCOPE = "items"
+UNCACHED_FORMATS = {"api"}
+_VERSION_KEY = "lets-learn:version:{scope}"
+_RESPONSE_KEY = "lets-learn:response-meta:{name}:{lang}:{format}:{digest}"
+# Each encoding of a stored body has its own key, so a hit reads only the
+# bytes it sends. Bodies are keyed by a token per store, never overwritten.
+_BODY_KEY = "lets-learn:response-body:{token}:{encoding}"
+IDENTITY = "identity"
+_LOCK_KEY = "lets-learn:regenerating:{digest}"
+# How long one request may hold the right to regenerate an entry, and how
+# long others without a stale copy wait for it before rendering themselves.
+REGENERATE_LOCK_TIMEOUT = 30
+REGENERATE_WAIT = 5.0
+_WAIT_INTERVAL = 0.05
+
+
+def category_scope(category) -> str:
+    return f"category:{category}"
+
+
+def _initial_version() -> int:
+    # Versions start from the clock so that a version key lost to cache
+    # eviction never restarts at a number an older entry was stored under.
+    return time.time_ns() // 1_000_000
+
+
+def get_versions(scopes) -> dict[str, int]:
+    keys = {_VERSION_KEY.format(scope=scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    versions = {}
+    for key, scope in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = _initial_version()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions[scope] = version
+    return versions
+
+
+def bump_versions(scopes) -> None:
+    for scope in set(scopes):
+        key = _VERSION_KEY.format(scope=scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), timeout=None)
+        else:
+            # incr on the file and db backends is get+set with the default
+            # timeout, which would let the version expire and be reseeded.
+            cache.touch(key, None)
+
+
+def bump_versions_on_commit(scopes) -> None:
+    scopes = set(scopes)
+    transaction.on_commit(lambda: bump_versions(scopes))
+
+
+def invalidate_items(categories) -> None:
+    bump_versions_on_commit(
+        [ALL_ITEMS_SCOPE]
+        + [category_scope(category) for category in categories if category is not None]
+    )
+
+
+def invalidate_categories(categories) -> None:
+    bump_versions_on_commit(
+        [CATALOGUE_SCOPE]
+        + [category_scope(category) for category in categories if category is not None]
+    )
+
+
+def variant_digest(request) -> str:
+    query = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    variant = (
+        request.get_host(),
+        request.path,
+        query,
+        request.accepted_renderer.format,
+    )
+    return hashlib.md5(repr(variant).encode(), usedforsecurity=False).hexdigest()
+
+
+def response_cache_key(request, name, variant) -> str:
+    return _RESPONSE_KEY.format(
+        name=name,
+        lang=request_lang(request),
+        format=request.accepted_renderer.format,
+        digest=variant,
+    )
+
+
+def versions_tag(scopes) -> str:
+    versions = get_versions(scopes)
+    return ".".join(str(versions[scope]) for scope in scopes)
+
+
+def jittered_ttl(ttl) -> float:
+    # Spread expiries so entries stored together do not all expire together.
+    return ttl * (1 - settings.CACHE_TTL_JITTER * random.random())
+
+
+def content_stats(queryset) -> dict:
+    return queryset.order_by().aggregate(
+        count=Count("pk"),
+        ids=Sum("pk"),
+        versions=Sum("version"),
+        last_modified=Max("updated_at"),
+    )
+
+
+def content_validators(
+    variant, *querysets, dated=False
+) -> tuple[str | None, int | None]:
+    stats = [content_stats(queryset) for queryset in querysets]
+    if not stats[0]["count"]:
+        return None, None
+    digest = hashlib.md5(
+        repr((variant, stats)).encode(), usedforsecurity=False
+    ).hexdigest()
+    if not dated:
+        # Max(updated_at) does not move when a row is deleted or leaves the
+        # queryset, so collections are validated by their ETag alone.
+        return quote_etag(digest), None
+    last_modified = max(
+        entry["last_modified"] for entry in stats if entry["last_modified"]
+    )
+    return quote_etag(digest), int(last_modified.timestamp())
+
+
+def _apply_validators(response, etag, last_modified):
+    if etag:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def _is_fresh(entry, tag) -> bool:
+    return entry["versions"] == tag and time.time() < entry["fresh_until"]
+
+
+def _lock_key(key) -> str:
+    # Hashed so the lock fits the 255 characters a ThrottleCounter key allows.
+    digest = hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+    return _LOCK_KEY.format(digest=digest)
+
+
+def _acquire_regeneration(key) -> bool:
+    # The lock lives in the atomic counter store: add() on the file and db
+    # cache backends is a read followed by a write, so two workers could
+    # both win it.
+    return shared_counters().increment(_lock_key(key), REGENERATE_LOCK_TIMEOUT) == 1
+
+
+def _release_regeneration(key) -> None:
+    shared_counters().delete(_lock_key(key))
+
+
+def _wait_for_entry(key, tag):
+    deadline = time.monotonic() + REGENERATE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(_WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry["versions"] == tag:
+            return entry
+        if not shared_counters().get(_lock_key(key)):
+            break
+    return None
+
+
+def cache_response(name, timeout=None):
+    # Entries are stored under a key without content versions and carry the
+    # versions they were rendered from, so an outdated or expired copy stays
+    # available while a single request regenerates it.
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.accepted_renderer.format in UNCACHED_FORMATS:
+                return view_func(request, *args, **kwargs)
+
+            view = request.parser_context["view"]
+            variant = variant_digest(request)
+            key = response_cache_key(request, name, variant)
+            tag = versions_tag(view.get_cache_scopes())
+            ttl = settings.CACHE_TTL if timeout is None else timeout
+
+            def store(rendered, etag, last_modified):
+                fresh_for = jittered_ttl(ttl)
+                stored_for = fresh_for + settings.CACHE_STALE_GRACE
+                encoded = compress_body(rendered.content)
+                token = uuid.uuid4().hex
+                bodies = {IDENTITY: rendered.content, **encoded}
+                cache.set_many(
+                    {
+                        _BODY_KEY.format(token=token, encoding=encoding): body
+                        for encoding, body in bodies.items()
+                    },
+                    stored_for,
+                )
+                entry = {
+                    "versions": tag,
+                    "fresh_until": time.time() + fresh_for,
+                    "token": token,
+                    "encodings": sorted(encoded),
+                    "content_type": rendered["Content-Type"],
+                    "etag": etag,
+                    "last_modified": last_modified,
+                }
+                cache.set(key, entry, stored_for)
+                return encoded
+
+            entry = cache.get(key)
+            regenerate = False
+            if entry is None or not _is_fresh(entry, tag):
+                # The request holding the lock renders; the others keep
+                # serving the outdated copy meanwhile.
+                if _acquire_regeneration(key):
+                    entry, regenerate = None, True
+                elif entry is None:
+                    entry = _wait_for_entry(key, tag)
+
+            if entry is not None:
+                etag, last_modified = entry["etag"], entry["last_modified"]
+                encoding = choose_encoding(request, entry["encodings"])
+                response = _apply_validators(
+                    HttpResponse(content_type=entry["content_type"]),
+                    etag,
+                    last_modified,
+                )
+                set_content_encoding(response, encoding)
+                conditional = get_conditional_response(
+                    request, etag=etag, last_modified=last_modified, response=response
+                )
+                if conditional is not response:
+                    return conditional
+                body_key = _BODY_KEY.format(
+                    token=entry["token"], encoding=encoding or IDENTITY
+                )
+                content = cache.get(body_key)
+                # A body evicted on its own is rendered again below.
+                if content is not None:
+                    response.content = content
+                    return response
+
+            stored_after_render = False
+            try:
+                etag, last_modified = view.get_conditional_validators(variant)
+                unconditional = _apply_validators(HttpResponse(), etag, last_modified)
+                patch_vary_headers(unconditional, ("Accept-Encoding",))
+                conditional = get_conditional_response(
+                    request,
+                    etag=etag,
+                    last_modified=last_modified,
+                    response=unconditional,
+                )
+                if conditional is not unconditional:
+                    return conditional
+
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    if regenerate:
+                        cache.delete(key)
+                    return response
+                _apply_validators(response, etag, last_modified)
+
+                def store_and_release(rendered):
+                    encoded = store(rendered, etag, last_modified)
+                    if regenerate:
+                        _release_regeneration(key)
+                    apply_encoding(rendered, request, encoded)
+
+                if hasattr(response, "add_post_render_callback"):
+                    response.add_post_render_callback(store_and_release)
+                    stored_after_render = True
+                else:
+                    encoded = store(response, etag, last_modified)
+                    apply_encoding(response, request, encoded)
+                return response
+            finally:
+                if regenerate and not stored_after_render:
+                    _release_regeneration(key)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,123 @@
+import hashlib
+import json
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .counters import shared_counters
+from .models import CategoryConfig
+from .snapshots import category_stamp, dumps_compact
+
+_HASH_LENGTH = 16
+_LOCK_KEY = "lets-learn:asset-lock:{asset}:{category}"
+
+
+class CategoryAssetBuilder:
+    asset_dir = None
+    map_filename = "map.json"
+    file_extension = None
+    lock_timeout = 300
+
+    def __init__(self, force=False):
+        self.force = force
+
+    def map_name(self, category) -> str:
+        return f"{self.asset_dir}/{category}/{self.map_filename}"
+
+    def load(self, category) -> dict | None:
+        name = self.map_name(category)
+        if not default_storage.exists(name):
+            return None
+        with default_storage.open(name) as stored:
+            return json.load(stored)
+
+    def get_stamp(self, category) -> str:
+        return category_stamp(category)
+
+    def build_category(self, category, previous=None) -> dict:
+        raise NotImplementedError
+
+    def write_file(self, category, content) -> tuple[str, str]:
+        digest = hashlib.sha256(content).hexdigest()[:_HASH_LENGTH]
+        name = f"{self.asset_dir}/{category.category}/{digest}.{self.file_extension}"
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(content))
+        return name, digest
+
+    def _save_map(self, category, entry):
+        name = self.map_name(category.category)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        default_storage.save(name, ContentFile(dumps_compact(entry)))
+
+    def _lock_key(self, category) -> str:
+        return _LOCK_KEY.format(asset=self.asset_dir, category=category)
+
+    def _remove_files(self, category, keep) -> list[str]:
+        removed = []
+        directory = f"{self.asset_dir}/{category}"
+        if not default_storage.exists(directory):
+            return removed
+        for filename in default_storage.listdir(directory)[1]:
+            name = f"{directory}/{filename}"
+            if filename.endswith(f".{self.file_extension}") and name not in keep:
+                default_storage.delete(name)
+                removed.append(name)
+        return removed
+
+    def ensure(self, category, prune=False) -> tuple[dict | None, bool]:
+        counters = shared_counters()
+        lock_key = self._lock_key(category.category)
+        force, built = self.force, False
+        replaced = None
+        while True:
+            stamp = self.get_stamp(category)
+            previous = self.load(category.category)
+            if previous and previous["stamp"] == stamp and not force:
+                return previous, built
+            if counters.increment(lock_key, self.lock_timeout) != 1:
+                # Another worker is rebuilding and checks the stamp again
+                # when it is done; keep serving the last build until then.
+                return previous, built
+            try:
+                entry = self.build_category(category, previous)
+                entry["stamp"] = stamp
+                self._save_map(category, entry)
+                if not built and previous:
+                    replaced = previous["file"]
+                if prune:
+                    # The file just replaced is kept for clients still
+                    # holding the previous map.
+                    self._remove_files(category.category, {entry["file"], replaced})
+            finally:
+                counters.delete(lock_key)
+            # Changes committed during the build are picked up by another pass.
+            force, built = False, True
+
+    def build(self, categories=None, prune=False) -> list[int]:
+        queryset = CategoryConfig.objects.all()
+        if categories:
+            queryset = queryset.filter(category__in=categories)
+        return [
+            category.category
+            for category in queryset
+            if self.ensure(category, prune=prune)[1]
+        ]
+
+    def prune(self, categories) -> list[str]:
+        # Replaced files stay around until pruned so clients holding the
+        # previous map can still fetch the file it points at.
+        counters = shared_counters()
+        removed = []
+        for category in categories:
+            lock_key = self._lock_key(category)
+            if counters.increment(lock_key, self.lock_timeout) != 1:
+                # A rebuild may have written a file its map does not name yet.
+                continue
+            try:
+                current = self.load(category)
+                if current:
+                    removed += self._remove_files(category, {current["file"]})
+            finally:
+                counters.delete(lock_key)
+        return removed
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models import Q
+
+from .models import ChangeLogEntry, ChangeLogSequence
+
+DEFAULT_READ_LIMIT = 500
+MAX_READ_LIMIT = 5000
+_ENTRY_FIELDS = (
+    "sequence",
+    "object_type",
+    "object_id",
+    "action",
+    "category",
+    "previous_category",
+    "version",
+    "source",
+    "created_at",
+)
+
+
+def item_change(item, action, version=None) -> dict:
+    previous = item.loaded_category_id
+    return {
+        "object_type": ChangeLogEntry.ObjectType.ITEM,
+        "object_id": item.pk,
+        "action": action,
+        "category": item.category_id,
+        "previous_category": previous if previous != item.category_id else None,
+        "version": item.version if version is None else version,
+    }
+
+
+def category_change(category, action) -> dict:
+    return {
+        "object_type": ChangeLogEntry.ObjectType.CATEGORY,
+        "object_id": category.pk,
+        "action": action,
+        "category": category.category,
+        "version": category.version,
+    }
+
+
+def record_changes(changes, source) -> list[ChangeLogEntry]:
+    if not changes:
+        return []
+    with transaction.atomic():
+        counter, _ = ChangeLogSequence.objects.select_for_update().get_or_create(pk=1)
+        first = counter.value + 1
+        counter.value += len(changes)
+        counter.save(update_fields=["value"])
+        entries = [
+            ChangeLogEntry(sequence=first + offset, source=source, **change)
+            for offset, change in enumerate(changes)
+        ]
+        return ChangeLogEntry.objects.bulk_create(entries)
+
+
+def latest_sequence() -> int:
+    return (
+        ChangeLogSequence.objects.filter(pk=1).values_list("value", flat=True).first() or 0
+    )
+
+
+def read_changes(after=0, limit=DEFAULT_READ_LIMIT, category=None, object_type=None):
+    queryset = ChangeLogEntry.objects.filter(sequence__gt=after)
+    if category is not None:
+        queryset = queryset.filter(Q(category=category) | Q(previous_category=category))
+    if object_type is not None:
+        queryset = queryset.filter(object_type=object_type)
+    limit = max(1, min(limit, MAX_READ_LIMIT))
+    return list(queryset.order_by("sequence").values(*_ENTRY_FIELDS)[:limit])
@@ -0,0 +1,81 @@
+import gzip
+
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies are compressed once when cached, so the slow, thorough settings pay off.
+MIN_COMPRESS_LENGTH = 200
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+_ENCODERS = {"gzip": lambda content: gzip.compress(content, GZIP_LEVEL, mtime=0)}
+if brotli is not None:
+    _ENCODERS["br"] = lambda content: brotli.compress(content, quality=BROTLI_QUALITY)
+# Server preference when a client accepts several encodings equally.
+ENCODING_PREFERENCE = ("br", "gzip")
+
+
+def compress_body(content) -> dict[str, bytes]:
+    if len(content) < MIN_COMPRESS_LENGTH:
+        return {}
+    encoded = {}
+    for encoding, encode in _ENCODERS.items():
+        body = encode(content)
+        if len(body) < len(content):
+            encoded[encoding] = body
+    return encoded
+
+
+def _accepted_encodings(header) -> dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(request, available):
+    if not available:
+        return None
+    accepted = _accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    best, best_quality = None, 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in available:
+            continue
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def set_content_encoding(response, encoding) -> None:
+    # Every representation depends on Accept-Encoding, including identity.
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if encoding is None:
+        return
+    response["Content-Encoding"] = encoding
+    etag = response.get("ETag")
+    if etag and not etag.startswith("W/"):
+        # The bytes differ per encoding, so the entity tag can only be weak.
+        response["ETag"] = "W/" + etag
+
+
+def apply_encoding(response, request, encoded) -> None:
+    encoding = choose_encoding(request, encoded)
+    if encoding is not None:
+        response.content = encoded[encoding]
+    set_content_encoding(response, encoding)
@@ -0,0 +1,121 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+
+from .models import ThrottleCounter
+
+COUNTER_CACHE_ALIAS = "throttle"
+# Expired database counters are deleted by roughly one increment in this many.
+PRUNE_EVERY = 1000
+
+
+class CacheCounters:
+    # Redis increments atomically and keeps the key's TTL; locmem does the
+    # same within a single process.
+    def __init__(self):
+        self.cache = ConnectionProxy(caches, COUNTER_CACHE_ALIAS)
+
+    def increment(self, key, timeout) -> int:
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            if self.cache.add(key, 1, timeout=timeout):
+                return 1
+            return self.cache.incr(key)
+
+    def increment_and_get(self, key, timeout, other_key) -> tuple[int, int]:
+        return self.increment(key, timeout), self.get(other_key)
+
+    def decrement(self, key):
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            pass
+
+    def get(self, key) -> int:
+        return self.cache.get(key, 0)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+
+class DatabaseCounters:
+    # A single upsert increments and returns the counter, so concurrent
+    # workers never lose an update. An expired row restarts from 1 as a
+    # missing cache key would.
+    def increment(self, key, timeout) -> int:
+        return self._upsert(key, timeout)[0]
+
+    def increment_and_get(self, key, timeout, other_key) -> tuple[int, int]:
+        # The other counter is read in the same statement, so a throttle
+        # check costs one round trip.
+        count, other = self._upsert(key, timeout, other_key)
+        return count, other or 0
+
+    def _upsert(self, key, timeout, other_key=None) -> tuple:
+        table = connection.ops.quote_name(ThrottleCounter._meta.db_table)
+        key_column, count_column, expires_column = (
+            connection.ops.quote_name(name) for name in ("key", "count", "expires_at")
+        )
+        now = timezone.now()
+        if random.randrange(PRUNE_EVERY) == 0:
+            ThrottleCounter.objects.filter(expires_at__lt=now).delete()
+        expires_at = connection.ops.adapt_datetimefield_value(
+            now + timedelta(seconds=timeout)
+        )
+        now = connection.ops.adapt_datetimefield_value(now)
+        expired = f"{table}.{expires_column} < %s"
+        params = [key, expires_at, now, now]
+        returning = count_column
+        if other_key is not None:
+            returning += (
+                f", (SELECT other.{count_column} FROM {table} other "
+                f"WHERE other.{key_column} = %s AND other.{expires_column} >= %s)"
+            )
+            params += [other_key, now]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({key_column}, {count_column}, {expires_column}) "
+                f"VALUES (%s, 1, %s) "
+                f"ON CONFLICT ({key_column}) DO UPDATE SET "
+                f"{count_column} = CASE WHEN {expired} THEN 1 "
+                f"ELSE {table}.{count_column} + 1 END, "
+                f"{expires_column} = CASE WHEN {expired} "
+                f"THEN excluded.{expires_column} ELSE {table}.{expires_column} END "
+                f"RETURNING {returning}",
+                params,
+            )
+            return cursor.fetchone()
+
+    def decrement(self, key):
+        ThrottleCounter.objects.filter(key=key, count__gt=0).update(
+            count=F("count") - 1
+        )
+
+    def get(self, key) -> int:
+        return (
+            ThrottleCounter.objects.filter(key=key, expires_at__gte=timezone.now())
+            .values_list("count", flat=True)
+            .first()
+            or 0
+        )
+
+    def delete(self, key):
+        ThrottleCounter.objects.filter(key=key).delete()
+
+
+COUNTER_STORES = {
+    "db": DatabaseCounters,
+    "redis": CacheCounters,
+    "locmem": CacheCounters,
+}
+
+
+def shared_counters():
+    return COUNTER_STORES[settings.THROTTLE_BACKEND]()
@@ -0,0 +1,103 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+DERIVATIVE_DIR = "derivatives"
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def derivative_name(source_name: str, width: int, extension: str) -> str:
+    return f"{DERIVATIVE_DIR}/{source_name}/{width}w.{extension}"
+
+
+def target_widths(source_width: int, widths=None) -> list[int]:
+    widths = sorted(widths or settings.IMAGE_DERIVATIVE_WIDTHS)
+    targets = {width for width in widths if width < source_width}
+    targets.add(min(source_width, widths[-1]))
+    return sorted(targets)
+
+
+def variants_current(variants, source_name, widths=None) -> bool:
+    if not source_name:
+        return not variants
+    return (
+        bool(variants)
+        and variants.get("source") == source_name
+        and variants.get("widths") == sorted(widths or settings.IMAGE_DERIVATIVE_WIDTHS)
+    )
+
+
+def _encode(image, extension) -> bytes:
+    image_format, options = DERIVATIVE_FORMATS[extension]
+    if image_format == "JPEG" and image.mode != "RGB":
+        background = Image.new("RGB", image.size, "white")
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background.paste(image, mask=image.getchannel("A"))
+        else:
+            background.paste(image.convert("RGB"))
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def commit_field_file(field_file):
+    if not field_file._committed:
+        field_file.save(field_file.name, field_file.file, save=False)
+
+
+def render_variants(source_name: str, widths=None, overwrite=False) -> tuple[dict, int]:
+    widths = sorted(widths or settings.IMAGE_DERIVATIVE_WIDTHS)
+    with default_storage.open(source_name, "rb") as stored:
+        with Image.open(stored) as source:
+            source = ImageOps.exif_transpose(source)
+            source.load()
+    if source.mode not in ("RGB", "RGBA"):
+        source = source.convert("RGBA" if "transparency" in source.info else "RGB")
+
+    entries = []
+    written = 0
+    for width in target_widths(source.width, widths):
+        height = max(1, round(source.height * width / source.width))
+        resized = None
+        for extension in DERIVATIVE_FORMATS:
+            name = derivative_name(source_name, width, extension)
+            exists = default_storage.exists(name)
+            if exists and overwrite:
+                default_storage.delete(name)
+            if overwrite or not exists:
+                if resized is None:
+                    resized = source.resize((width, height), Image.Resampling.LANCZOS)
+                default_storage.save(name, ContentFile(_encode(resized, extension)))
+                written += 1
+            entries.append(
+                {"name": name, "format": extension, "width": width, "height": height}
+            )
+    return {"source": source_name, "widths": widths, "variants": entries}, written
+
+
+def variant_entries(variants, media_url) -> list[dict]:
+    return [
+        {
+            "url": media_url(entry["name"]),
+            "format": entry["format"],
+            "width": entry["width"],
+            "height": entry["height"],
+        }
+        for entry in (variants or {}).get("variants", [])
+    ]
+
+
+def variant_representation(request, variants) -> list[dict]:
+    def media_url(name):
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+
+    return variant_entries(variants, media_url)
@@ -0,0 +1,170 @@
+import csv
+import json
+import os
+from tempfile import TemporaryFile
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.encoding import escape_uri_path
+from drf_excel.renderers import XLSXRenderer
+from drf_excel.utilities import sanitize_value
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_CHUNK_SIZE = 2000
+XLSX_COLUMN_WIDTH = 20
+XLSX_SHEET_TITLE = "Report"
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+NDJSON_CONTENT_TYPE = "application/x-ndjson; charset=utf-8"
+ERROR_CONTENT_TYPE = "application/json; charset=utf-8"
+_STREAM_BLOCK_SIZE = 64 * 1024
+_END = object()
+
+
+class _StreamingExportRenderer(BaseRenderer):
+    # Exports build their own streaming response, so only error bodies reach
+    # the renderer. They are JSON whatever the export format and are
+    # labelled as such.
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        response = (renderer_context or {}).get("response")
+        if response is not None:
+            response["Content-Type"] = ERROR_CONTENT_TYPE
+        return json.dumps(data, ensure_ascii=False).encode(self.charset)
+
+
+class CSVRenderer(_StreamingExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NDJSONRenderer(_StreamingExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class _LineBuffer:
+    def write(self, value):
+        return value
+
+
+def export_filename(filename: str, extension: str) -> str:
+    return f"{os.path.splitext(filename)[0]}.{extension}"
+
+
+def export_headers(serializer) -> list[str]:
+    return [
+        name
+        for name, field in serializer.fields.items()
+        if not getattr(field, "write_only", False)
+    ]
+
+
+def iter_export_rows(queryset, serializer, chunk_size=EXPORT_CHUNK_SIZE):
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(instance)
+
+
+def _xlsx_cell(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return sanitize_value(value)
+
+
+def _csv_cell(value):
+    if isinstance(value, str):
+        return sanitize_value(value)
+    return value
+
+
+def iter_ndjson(rows):
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for row in rows:
+        yield f"{encoder.encode(row)}\n".encode()
+
+
+def iter_csv(rows, headers):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(headers).encode()
+    for row in rows:
+        yield writer.writerow([_csv_cell(row.get(header)) for header in headers]).encode()
+
+
+def write_xlsx(rows, headers, target) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(XLSX_SHEET_TITLE)
+    for column in range(1, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(column)].width = XLSX_COLUMN_WIDTH
+    ws.append(headers)
+    for row in rows:
+        ws.append([_xlsx_cell(row.get(header)) for header in headers])
+    wb.save(target)
+
+
+def _iter_xlsx(rows, headers):
+    with TemporaryFile() as tmp:
+        write_xlsx(rows, headers, tmp)
+        tmp.seek(0)
+        while chunk := tmp.read(_STREAM_BLOCK_SIZE):
+            yield chunk
+
+
+def coalesce_chunks(chunks, block_size=_STREAM_BLOCK_SIZE):
+    pending = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= block_size:
+            yield b"".join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield b"".join(pending)
+
+
+async def _aiter_chunks(chunks):
+    # Under ASGI Django buffers a synchronous iterator whole before sending
+    # it. Each chunk is produced on the request's sync thread instead, where
+    # the export's database cursor lives.
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, _END)) is not _END:
+        yield chunk
+
+
+def attachment_response(streaming_content, content_type, filename, request=None):
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        streaming_content = _aiter_chunks(streaming_content)
+    response = StreamingHttpResponse(streaming_content, content_type=content_type)
+    response["Content-Disposition"] = f"attachment; filename={escape_uri_path(filename)}"
+    return response
+
+
+def stream_xlsx(rows, headers, filename, request=None) -> StreamingHttpResponse:
+    return attachment_response(
+        _iter_xlsx(rows, headers), XLSXRenderer.media_type, filename, request
+    )
+
+
+def stream_ndjson(rows, filename, request=None) -> StreamingHttpResponse:
+    return attachment_response(
+        coalesce_chunks(iter_ndjson(rows)),
+        NDJSON_CONTENT_TYPE,
+        export_filename(filename, "ndjson"),
+        request,
+    )
+
+
+def stream_csv(rows, headers, filename, request=None) -> StreamingHttpResponse:
+    return attachment_response(
+        coalesce_chunks(iter_csv(rows, headers)),
+        CSV_CONTENT_TYPE,
+        export_filename(filename, "csv"),
+        request,
+    )
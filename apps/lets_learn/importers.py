@@ -0,0 +1,200 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .changelog import item_change, record_changes
+from .media_fetch import MediaFetcher, MediaFetchError, prefetched_content_file
+from .media_jobs import schedule_category_assets, schedule_variants
+from .mixins import row_value
+from .models import ChangeLogEntry, LearnItem
+from .registry import request_categories
+
+BULK_IMPORT_BATCH_SIZE = 500
+BULK_UPDATE_FIELDS = [
+    "category",
+    "name",
+    "slug",
+    "content_name",
+    "object_image",
+    "object_image_variants",
+    "object_color",
+    "audio_metadata",
+    "order",
+    "updated_at",
+    "version",
+]
+
+
+def _to_int(value):
+    if value is None or value == "":
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not number.is_integer():
+        return None
+    return int(number)
+
+
+def _copy_item(item):
+    values = {}
+    for field in LearnItem._meta.concrete_fields:
+        value = getattr(item, field.attname)
+        if isinstance(value, FieldFile):
+            value = value.name
+        values[field.attname] = value
+    copy = LearnItem(**values)
+    copy._state.adding = False
+    copy.loaded_category_id = item.loaded_category_id
+    return copy
+
+
+class LearnItemBulkImporter:
+    def __init__(self, default_category=None, batch_size=BULK_IMPORT_BATCH_SIZE):
+        self.default_category = default_category
+        self.batch_size = batch_size
+        self.media = {}
+        self.affected_categories = set()
+
+    def parse_rows(self, rows, header_mapping):
+        parsed = []
+        for row in rows:
+            parsed.append(
+                {
+                    "id": row_value(row, header_mapping, "id"),
+                    "category": row_value(row, header_mapping, "category"),
+                    "name": row_value(row, header_mapping, "name"),
+                    "content_name": row_value(row, header_mapping, "content_name"),
+                    "object_image_url": row_value(
+                        row, header_mapping, "object_image_url"
+                    ),
+                    "object_color": row_value(row, header_mapping, "object_color"),
+                    "order": row_value(row, header_mapping, "order"),
+                }
+            )
+        return parsed
+
+    def resolve_categories(self, parsed):
+        values = {_to_int(data["category"]) for data in parsed if data["category"]}
+        values.discard(None)
+        if not values:
+            return {}
+        categories = request_categories().by_category
+        return {value: categories[value] for value in values if value in categories}
+
+    def resolve_items(self, parsed):
+        ids = {_to_int(data["id"]) for data in parsed if data["id"]}
+        ids.discard(None)
+        if not ids:
+            return {}
+        return LearnItem.objects.in_bulk(ids)
+
+    def prefetch_media(self, parsed):
+        urls = [data["object_image_url"] for data in parsed if data["name"]]
+        with MediaFetcher() as fetcher:
+            self.media = fetcher.fetch_all(urls)
+
+    def fetch_image(self, url, fallback_name):
+        return prefetched_content_file(self.media, url, fallback_name)
+
+    def build_item(self, data, categories, items):
+        name = data["name"]
+        if not name:
+            return None, "skipped"
+
+        if data["category"]:
+            category = categories.get(_to_int(data["category"]))
+        else:
+            category = self.default_category
+        if not category:
+            return None, "skipped"
+
+        existing = None
+        if data["id"]:
+            item_id = _to_int(data["id"])
+            if item_id is None:
+                return None, "skipped"
+            existing = items.get(item_id)
+        if existing is None:
+            item = LearnItem(category=category)
+            result = "created"
+        else:
+            item = _copy_item(existing)
+            result = "updated"
+
+        item.category = category
+        item.name = str(name)
+        item.content_name = data["content_name"]
+        if data["order"] is not None:
+            order = _to_int(data["order"])
+            if order is None:
+                return None, "skipped"
+            item.order = order
+
+        image_url = data["object_image_url"]
+        if image_url:
+            item.object_color = None
+        elif data["object_color"]:
+            item.object_color = str(data["object_color"])
+            item.object_image = None
+
+        try:
+            item.clean_fields(exclude={"category", "object_image"})
+            if image_url:
+                fallback = f"{slugify(item.name) or 'item'}.png"
+                content, filename = self.fetch_image(image_url, fallback)
+                item.object_image.save(filename, content, save=False)
+            item.clean()
+            item.populate_derived_fields()
+        except (ValidationError, MediaFetchError, OSError):
+            return None, "skipped"
+
+        return item, result
+
+    def run(self, rows, header_mapping) -> dict[str, int]:
+        parsed = self.parse_rows(rows, header_mapping)
+        categories = self.resolve_categories(parsed)
+        items = self.resolve_items(parsed)
+        self.prefetch_media(parsed)
+
+        counts = {"created": 0, "updated": 0, "skipped": 0}
+        to_create = []
+        to_update = {}
+        for data in parsed:
+            item, result = self.build_item(data, categories, items)
+            counts[result] += 1
+            if result == "created":
+                to_create.append(item)
+            elif result == "updated":
+                self.affected_categories.add(items[item.pk].category_id)
+                items[item.pk] = item
+                to_update[item.pk] = item
+            if item is not None:
+                self.affected_categories.add(item.category_id)
+
+        now = timezone.now()
+        changes = []
+        for item in to_update.values():
+            changes.append(item_change(item, ChangeLogEntry.Action.UPDATED, item.version + 1))
+            item.updated_at = now
+            item.version = F("version") + 1
+
+        with transaction.atomic():
+            LearnItem.objects.bulk_create(to_create, batch_size=self.batch_size)
+            LearnItem.objects.bulk_update(
+                list(to_update.values()),
+                BULK_UPDATE_FIELDS,
+                batch_size=self.batch_size,
+            )
+            changes.extend(
+                item_change(item, ChangeLogEntry.Action.CREATED) for item in to_create
+            )
+            record_changes(changes, ChangeLogEntry.Source.IMPORT)
+            for item in [*to_create, *to_update.values()]:
+                schedule_variants(item, ChangeLogEntry.Source.DERIVATIVE)
+            schedule_category_assets(self.affected_categories)
+        return counts
@@ -0,0 +1,200 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from apps.lets_learn.audio_metadata import audio_metadata_current, probe_audio
+from apps.lets_learn.caching import invalidate_categories, invalidate_items
+from apps.lets_learn.derivatives import render_variants, variants_current
+from apps.lets_learn.media_jobs import record_derived
+from apps.lets_learn.models import (
+    CategoryConfig,
+    ChangeLogEntry,
+    LearnCategory,
+    LearnItem,
+)
+from apps.lets_learn.swatches import (
+    DEFAULT_SWATCH_SIZE,
+    SWATCH_FORMATS,
+    canonical_extension,
+    render_swatch,
+    swatch_name,
+)
+
+MEDIA_TARGETS = {
+    "items": (LearnItem, "object_image", "object_image_variants"),
+    "categories": (CategoryConfig, "image", "image_variants"),
+    "audio": (LearnItem, "audio", "audio_metadata"),
+}
+AUDIO_TARGET = "audio"
+SWATCH_TARGET = "swatches"
+
+
+def _init_worker():
+    django.setup()
+
+
+def _derive(source_name, widths, overwrite):
+    return render_variants(source_name, widths, overwrite)
+
+
+def _probe_audio(source_name):
+    with default_storage.open(source_name, "rb") as stored:
+        data = stored.read()
+    return {"source": source_name, **probe_audio(data, source_name)}, 0
+
+
+def _render_swatch(hex_color, extension):
+    name = swatch_name(hex_color, DEFAULT_SWATCH_SIZE, extension)
+    content = render_swatch(hex_color, DEFAULT_SWATCH_SIZE, extension)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(content))
+    return None, 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenerate image derivatives, swatches and audio metadata for existing "
+        "media in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            choices=[*MEDIA_TARGETS, SWATCH_TARGET],
+            help="Only process these targets (default: all).",
+        )
+        parser.add_argument(
+            "--category",
+            type=int,
+            nargs="+",
+            choices=LearnCategory.values,
+            help="Only consider these categories.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: CPU count).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Reprocess sources even when they are up to date.",
+        )
+
+    def collect_jobs(self, targets, categories, force):
+        widths = sorted(settings.IMAGE_DERIVATIVE_WIDTHS)
+        jobs = []
+        skipped = 0
+        for target in targets:
+            if target == SWATCH_TARGET:
+                colors = LearnItem.objects.exclude(object_color__isnull=True).exclude(
+                    object_color=""
+                )
+                if categories:
+                    colors = colors.filter(category__category__in=categories)
+                # "jpg" and "jpeg" share one stored file.
+                extensions = sorted({canonical_extension(ext) for ext in SWATCH_FORMATS})
+                # Clear the model ordering, or "order" joins the DISTINCT.
+                colors = colors.order_by("object_color").values_list(
+                    "object_color", flat=True
+                )
+                for color in colors.distinct():
+                    for extension in extensions:
+                        name = swatch_name(color, DEFAULT_SWATCH_SIZE, extension)
+                        if not force and default_storage.exists(name):
+                            skipped += 1
+                            continue
+                        jobs.append(
+                            (target, None, (color, extension), _render_swatch, (color, extension))
+                        )
+                continue
+
+            model, field, variants_field = MEDIA_TARGETS[target]
+            category_field = "category_id" if model is LearnItem else "category"
+            rows = model.objects.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""})
+            if categories:
+                lookup = "category__category__in" if model is LearnItem else "category__in"
+                rows = rows.filter(**{lookup: categories})
+            for pk, name, derived, category in (
+                rows.order_by("pk")
+                .values_list("pk", field, variants_field, category_field)
+                .iterator()
+            ):
+                if target == AUDIO_TARGET:
+                    current = audio_metadata_current(derived, name)
+                    func, args = _probe_audio, (name,)
+                else:
+                    current = variants_current(derived, name, widths)
+                    func, args = _derive, (name, widths, force)
+                if current and not force:
+                    skipped += 1
+                    continue
+                jobs.append((target, pk, (name, category), func, args))
+        return jobs, skipped
+
+    def record(self, target, pk, name, category, derived):
+        model, field, derived_field = MEDIA_TARGETS[target]
+        return record_derived(
+            model,
+            pk,
+            field,
+            derived_field,
+            name,
+            category,
+            derived,
+            ChangeLogEntry.Source.BACKFILL,
+        )
+
+    def handle(self, *args, **options):
+        targets = options["only"] or [*MEDIA_TARGETS, SWATCH_TARGET]
+        jobs, skipped = self.collect_jobs(targets, options["category"], options["force"])
+        if not jobs:
+            self.stdout.write(f"Nothing to do ({skipped} sources up to date).")
+            return
+
+        started = time.perf_counter()
+        written = 0
+        failures = []
+        changed = {target: set() for target in MEDIA_TARGETS}
+        with ProcessPoolExecutor(
+            max_workers=max(1, options["workers"]), initializer=_init_worker
+        ) as pool:
+            futures = {pool.submit(func, *args): job for *job, func, args in jobs}
+            for future in as_completed(futures):
+                target, pk, label = futures[future]
+                try:
+                    derived, files = future.result()
+                except Exception as exc:
+                    failures.append((target, label[0], exc))
+                    continue
+                written += files
+                if target in MEDIA_TARGETS and self.record(
+                    target, pk, label[0], label[1], derived
+                ):
+                    changed[target].add(label[1])
+
+        if changed["items"] or changed["audio"]:
+            invalidate_items(changed["items"] | changed["audio"])
+        if changed["categories"]:
+            invalidate_categories(changed["categories"])
+
+        elapsed = time.perf_counter() - started
+        processed = len(jobs) - len(failures)
+        self.stdout.write(
+            f"Processed {processed}/{len(jobs)} sources ({written} files written, "
+            f"{skipped} up to date) in {elapsed:.2f}s: "
+            f"{processed / elapsed:.1f} sources/s with {options['workers']} workers."
+        )
+        for target, label, exc in failures:
+            self.stderr.write(f"{target} {label}: {exc}")
+        if failures:
+            self.stderr.write(self.style.ERROR(f"{len(failures)} sources failed."))
@@ -0,0 +1,120 @@
+import time
+import tracemalloc
+from tempfile import TemporaryFile
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from apps.lets_learn.exporters import (
+    export_headers,
+    iter_csv,
+    iter_export_rows,
+    iter_ndjson,
+    write_xlsx,
+)
+from apps.lets_learn.models import CategoryConfig, LearnItem
+from apps.lets_learn.serializers import LearnItemExportSerializer
+
+DEFAULT_ROW_COUNTS = [10_000, 100_000]
+SEED_BATCH_SIZE = 5000
+
+
+def _consume(chunks) -> int:
+    return sum(len(chunk) for chunk in chunks)
+
+
+def _export_xlsx(rows, headers) -> int:
+    with TemporaryFile() as tmp:
+        write_xlsx(rows, headers, tmp)
+        return tmp.tell()
+
+
+EXPORTERS = {
+    "xlsx": _export_xlsx,
+    "csv": lambda rows, headers: _consume(iter_csv(rows, headers)),
+    "ndjson": lambda rows, headers: _consume(iter_ndjson(rows)),
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare XLSX, CSV and NDJSON export throughput on synthetic rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            nargs="+",
+            default=DEFAULT_ROW_COUNTS,
+            help="Row counts to benchmark (default: 10000 100000).",
+        )
+        parser.add_argument(
+            "--formats",
+            nargs="+",
+            choices=sorted(EXPORTERS),
+            default=list(EXPORTERS),
+        )
+        parser.add_argument(
+            "--memory",
+            action="store_true",
+            help="Also measure peak Python heap usage with tracemalloc.",
+        )
+
+    def handle(self, *args, **options):
+        for count in options["rows"]:
+            try:
+                with transaction.atomic():
+                    queryset = self._seed(count)
+                    for name in options["formats"]:
+                        self._run(name, queryset, count, options["memory"])
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _seed(self, count):
+        category = CategoryConfig.objects.order_by("category").first()
+        if category is None:
+            category = CategoryConfig.objects.create(category=1, name="Benchmark")
+        last_id = LearnItem.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+        LearnItem.objects.bulk_create(
+            (
+                LearnItem(
+                    category=category,
+                    name=f"Item {index}",
+                    slug=f"item-{index}",
+                    content_name="नमस्ते संसार",
+                    object_color="#ff0000",
+                    order=index,
+                )
+                for index in range(count)
+            ),
+            batch_size=SEED_BATCH_SIZE,
+        )
+        return LearnItem.objects.filter(id__gt=last_id)
+
+    def _run(self, name, queryset, count, measure_memory):
+        serializer = LearnItemExportSerializer()
+        headers = export_headers(serializer)
+        rows = iter_export_rows(queryset, serializer)
+
+        if measure_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        size = EXPORTERS[name](rows, headers)
+        elapsed = time.perf_counter() - started
+        peak = None
+        if measure_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        line = (
+            f"{name:>6} {count:>8} rows  {elapsed:8.2f}s  "
+            f"{count / elapsed:10.0f} rows/s  {size / 1024:10.0f} KiB"
+        )
+        if peak is not None:
+            line += f"  peak {peak / 1024 / 1024:6.1f} MiB"
+        self.stdout.write(line)
@@ -0,0 +1,129 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apps.lets_learn.models import CategoryConfig, LearnItem
+from apps.lets_learn.serializers import LearnItemReadSerializer, LearnItemSerializer
+
+DEFAULT_ITEM_COUNTS = [1_000, 10_000]
+SEED_BATCH_SIZE = 5000
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _serializer_path(queryset, request):
+    return LearnItemSerializer(queryset, many=True, context={"request": request}).data
+
+
+def _values_path(queryset, request):
+    rows = queryset.values(*LearnItemReadSerializer.values_fields)
+    return LearnItemReadSerializer(request).serialize(rows)
+
+
+class Command(BaseCommand):
+    help = "Compare LearnItemSerializer with the values() read path on synthetic items."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--items",
+            type=int,
+            nargs="+",
+            default=DEFAULT_ITEM_COUNTS,
+            help="Item counts to benchmark (default: 1000 10000).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per path; the fastest is reported.",
+        )
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get("/api/lets-learn/items/"))
+        renderer = JSONRenderer()
+        for count in options["items"]:
+            try:
+                with transaction.atomic():
+                    queryset = self._seed(count)
+                    timings = {}
+                    outputs = {}
+                    for name, path in (
+                        ("serializer", _serializer_path),
+                        ("values", _values_path),
+                    ):
+                        best = None
+                        for _ in range(max(1, options["repeat"])):
+                            started = time.perf_counter()
+                            outputs[name] = renderer.render(path(queryset, request))
+                            elapsed = time.perf_counter() - started
+                            best = elapsed if best is None else min(best, elapsed)
+                        timings[name] = best
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+            if outputs["serializer"] != outputs["values"]:
+                raise CommandError(f"Outputs differ for {count} items.")
+            for name, elapsed in timings.items():
+                self.stdout.write(
+                    f"{name:>10} {count:>8} items  {elapsed:8.3f}s  "
+                    f"{count / elapsed:10.0f} items/s"
+                )
+            self.stdout.write(
+                f"{'speedup':>10} {count:>8} items  "
+                f"{timings['serializer'] / timings['values']:7.1f}x  "
+                f"(identical {len(outputs['values']) / 1024:.0f} KiB)"
+            )
+
+    def _seed(self, count):
+        categories = list(CategoryConfig.objects.order_by("category")[:2])
+        if not categories:
+            categories = [CategoryConfig.objects.create(category=1, name="Benchmark")]
+        last_id = LearnItem.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+        variants = {
+            "source": "learn_items/objects/item.png",
+            "widths": [160, 320],
+            "variants": [
+                {
+                    "name": f"derivatives/learn_items/objects/item.png/{width}w.{extension}",
+                    "format": extension,
+                    "width": width,
+                    "height": width,
+                }
+                for width in (160, 320)
+                for extension in ("webp", "jpg")
+            ],
+        }
+        audio_metadata = {
+            "source": "learn_items/audio/item.mp3",
+            "duration": 1.25,
+            "size": 20000,
+            "sha256": "0" * 64,
+            "content_type": "audio/mpeg",
+        }
+        LearnItem.objects.bulk_create(
+            (
+                LearnItem(
+                    category=categories[index % len(categories)],
+                    name=f"Item {index}",
+                    slug=f"item-{index}",
+                    content_name="नमस्ते संसार",
+                    object_image="" if index % 2 else f"learn_items/objects/item {index}.png",
+                    object_image_variants={} if index % 2 else variants,
+                    object_color="#ff0000" if index % 2 else None,
+                    audio=f"learn_items/audio/item-{index}.mp3",
+                    audio_metadata=audio_metadata,
+                    order=index,
+                )
+                for index in range(count)
+            ),
+            batch_size=SEED_BATCH_SIZE,
+        )
+        return LearnItem.objects.filter(id__gt=last_id).order_by("order", "id")
@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from apps.lets_learn.renderers import FastJSONRenderer, orjson
+
+DEFAULT_ITEM_COUNTS = [1_000, 10_000]
+
+
+class _StdlibJSONRenderer(FastJSONRenderer):
+    use_orjson = False
+
+
+RENDERERS = {
+    "drf": JSONRenderer,
+    "stdlib": _StdlibJSONRenderer,
+    "orjson": FastJSONRenderer,
+}
+
+
+def _payload(count) -> list[dict]:
+    return [
+        {
+            "id": index,
+            "category": index % 14 + 1,
+            "name": f"Item {index}",
+            "slug": f"item-{index}",
+            "content_name": "नमस्ते संसार, यो एउटा नमूना वाक्य हो।",
+            "object_image": f"https://example.com/media/learn_items/objects/{index}.png",
+            "object_image_variants": [
+                {
+                    "url": f"https://example.com/media/derivatives/{index}/{width}w.webp",
+                    "format": "webp",
+                    "width": width,
+                    "height": width,
+                }
+                for width in (160, 320, 640)
+            ],
+            "object_color": None,
+            "audio": f"https://example.com/media/learn_items/audio/{index}.mp3",
+            "audio_metadata": {"duration": 1.25, "size": 20000, "content_type": "audio/mpeg"},
+            "order": index,
+        }
+        for index in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Compare the stock DRF JSONRenderer with FastJSONRenderer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--items",
+            type=int,
+            nargs="+",
+            default=DEFAULT_ITEM_COUNTS,
+            help="Item counts to benchmark (default: 1000 10000).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per renderer; the fastest is reported.",
+        )
+
+    def handle(self, *args, **options):
+        renderers = {
+            name: renderer_class()
+            for name, renderer_class in RENDERERS.items()
+            if name != "orjson" or orjson is not None
+        }
+        if orjson is None:
+            self.stdout.write("orjson is not installed; skipping it.")
+
+        for count in options["items"]:
+            data = _payload(count)
+            baseline = None
+            outputs = {}
+            for name, renderer in renderers.items():
+                best = None
+                for _ in range(max(1, options["repeat"])):
+                    started = time.perf_counter()
+                    outputs[name] = renderer.render(data, "application/json")
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                baseline = baseline or best
+                self.stdout.write(
+                    f"{name:>7} {count:>8} items  {best * 1000:9.1f} ms  "
+                    f"{baseline / best:5.1f}x  {len(outputs[name]) / 1024:8.0f} KiB"
+                )
+            if "orjson" in outputs and outputs["orjson"] != outputs["stdlib"]:
+                raise CommandError(f"orjson and stdlib output differ for {count} items.")
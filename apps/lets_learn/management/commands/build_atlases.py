@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.lets_learn.atlases import ATLAS_TILE_SIZE, AtlasBuilder
+from apps.lets_learn.models import LearnCategory
+
+
+class Command(BaseCommand):
+    help = "Pack each category's images and colour swatches into one atlas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category",
+            type=int,
+            nargs="+",
+            choices=LearnCategory.values,
+            help="Only consider these categories.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild every tile even when a category has not changed.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete atlas images replaced by this or earlier builds.",
+        )
+        parser.add_argument(
+            "--tile-size",
+            type=int,
+            default=ATLAS_TILE_SIZE,
+            help=f"Tile edge in pixels (default: {ATLAS_TILE_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        builder = AtlasBuilder(force=options["force"], tile_size=options["tile_size"])
+        started = time.perf_counter()
+        rebuilt = builder.build(categories=options["category"])
+        elapsed = time.perf_counter() - started
+
+        if rebuilt:
+            self.stdout.write(
+                f"Rebuilt {len(rebuilt)} atlases ({', '.join(map(str, rebuilt))}) "
+                f"in {elapsed:.2f}s."
+            )
+        else:
+            self.stdout.write(f"Atlases up to date ({elapsed:.2f}s).")
+
+        if options["prune"]:
+            categories = options["category"] or LearnCategory.values
+            removed = builder.prune(categories)
+            self.stdout.write(f"Pruned {len(removed)} replaced atlas images.")
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.lets_learn.audio_bundles import AudioBundleBuilder
+from apps.lets_learn.models import LearnCategory
+
+
+class Command(BaseCommand):
+    help = "Concatenate each category's audio into one bundle with an offset table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category",
+            type=int,
+            nargs="+",
+            choices=LearnCategory.values,
+            help="Only consider these categories.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-read every file even when a category has not changed.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete bundles replaced by this or earlier builds.",
+        )
+
+    def handle(self, *args, **options):
+        builder = AudioBundleBuilder(force=options["force"])
+        started = time.perf_counter()
+        rebuilt = builder.build(categories=options["category"])
+        elapsed = time.perf_counter() - started
+
+        if rebuilt:
+            self.stdout.write(
+                f"Rebuilt {len(rebuilt)} audio bundles ({', '.join(map(str, rebuilt))}) "
+                f"in {elapsed:.2f}s."
+            )
+        else:
+            self.stdout.write(f"Audio bundles up to date ({elapsed:.2f}s).")
+
+        if options["prune"]:
+            categories = options["category"] or LearnCategory.values
+            removed = builder.prune(categories)
+            self.stdout.write(f"Pruned {len(removed)} replaced audio bundles.")
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.lets_learn.packs import PackBuilder
+from apps.lets_learn.models import LearnCategory
+
+
+class Command(BaseCommand):
+    help = "Build a versioned offline pack (manifest, item JSON, media) per category."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category",
+            type=int,
+            nargs="+",
+            choices=LearnCategory.values,
+            help="Only consider these categories.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-read every media file instead of reusing the previous pack.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help=(
+                "Delete pack archives replaced by this or earlier builds; "
+                "manifests are kept for delta sync."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        builder = PackBuilder(force=options["force"])
+        started = time.perf_counter()
+        rebuilt = builder.build(categories=options["category"])
+        elapsed = time.perf_counter() - started
+
+        if rebuilt:
+            self.stdout.write(
+                f"Rebuilt {len(rebuilt)} packs ({', '.join(map(str, rebuilt))}) "
+                f"in {elapsed:.2f}s."
+            )
+        else:
+            self.stdout.write(f"Packs up to date ({elapsed:.2f}s).")
+
+        if options["prune"]:
+            categories = options["category"] or LearnCategory.values
+            removed = builder.prune(categories)
+            self.stdout.write(f"Pruned {len(removed)} replaced packs.")
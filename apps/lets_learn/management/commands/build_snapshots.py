@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.lets_learn.models import LearnCategory
+from apps.lets_learn.snapshots import SnapshotBuilder
+
+
+class Command(BaseCommand):
+    help = "Build minified JSON snapshots for every category and language."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category",
+            type=int,
+            nargs="+",
+            choices=LearnCategory.values,
+            help="Only consider these categories.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild even when a category has not changed.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete snapshot files replaced by this build.",
+        )
+        parser.add_argument(
+            "--base-url",
+            help="Absolute base URL for media links (default: SNAPSHOT_BASE_URL).",
+        )
+
+    def handle(self, *args, **options):
+        builder = SnapshotBuilder(base_url=options["base_url"], force=options["force"])
+        started = time.perf_counter()
+        result = builder.build(categories=options["category"])
+        elapsed = time.perf_counter() - started
+
+        if options["prune"]:
+            builder.prune(result["stale_files"])
+
+        rebuilt = result["rebuilt"]
+        if rebuilt:
+            self.stdout.write(
+                f"Rebuilt {len(rebuilt)} categories ({', '.join(map(str, rebuilt))}) "
+                f"in {elapsed:.2f}s."
+            )
+        else:
+            self.stdout.write(f"Snapshots up to date ({elapsed:.2f}s).")
@@ -0,0 +1,26 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss statistics of the shared response cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after printing them.",
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(cache, "get_stats"):
+            raise CommandError("The default cache does not record statistics.")
+        stats = cache.get_stats()
+        hit_rate = stats["hit_rate"]
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} "
+            f"hit_rate={'n/a' if hit_rate is None else f'{hit_rate:.2%}'}"
+        )
+        if options["reset"]:
+            cache.reset_stats()
+            self.stdout.write("Counters reset.")
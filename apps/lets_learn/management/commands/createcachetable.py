@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import BaseDatabaseCache
+from django.core.management.commands import createcachetable
+
+
+class Command(createcachetable.Command):
+    def handle(self, *tablenames, **options):
+        super().handle(*tablenames, **options)
+        if tablenames:
+            return
+        for cache_alias in settings.CACHES:
+            inner = getattr(caches[cache_alias], "_cache", None)
+            if isinstance(inner, BaseDatabaseCache):
+                self.create_table(options["database"], inner._table, options["dry_run"])
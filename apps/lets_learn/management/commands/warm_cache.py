@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.lets_learn.models import LearnCategory
+from apps.lets_learn.serializers import ALLOWED_LANGS
+from apps.lets_learn.warming import (
+    DEFAULT_WARM_WORKERS,
+    WARM_FORMATS,
+    default_warm_host,
+    warm_cache,
+    warm_urls,
+)
+
+
+class Command(BaseCommand):
+    help = "Pre-render the cached lets_learn responses for every category and language."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category",
+            type=int,
+            nargs="+",
+            choices=LearnCategory.values,
+            help="Only warm these categories.",
+        )
+        parser.add_argument(
+            "--lang",
+            nargs="+",
+            choices=sorted(ALLOWED_LANGS),
+            help="Only warm these languages.",
+        )
+        parser.add_argument(
+            "--format",
+            nargs="+",
+            choices=WARM_FORMATS,
+            default=["json"],
+            help="Response formats to warm (default: json).",
+        )
+        parser.add_argument(
+            "--host",
+            nargs="+",
+            help="Hosts clients use; cached responses vary by host.",
+        )
+        parser.add_argument(
+            "--secure",
+            action="store_true",
+            help="Warm https URLs.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WARM_WORKERS,
+            help=f"Concurrent requests (default: {DEFAULT_WARM_WORKERS}).",
+        )
+
+    def handle(self, *args, **options):
+        urls = warm_urls(options["category"], options["lang"], options["format"])
+        failed = 0
+        for host in options["host"] or [default_warm_host()]:
+            started = time.perf_counter()
+            results = warm_cache(urls, host, options["secure"], options["workers"])
+            elapsed = time.perf_counter() - started
+            for url, status, seconds in results:
+                if status != 200:
+                    failed += 1
+                self.stdout.write(f"{status} {seconds * 1000:8.1f} ms  {host}{url}")
+            slowest = max(seconds for _, _, seconds in results)
+            self.stdout.write(
+                f"Warmed {len(results)} URLs for {host} in {elapsed:.2f}s "
+                f"(slowest {slowest * 1000:.1f} ms)."
+            )
+        if failed:
+            raise CommandError(f"{failed} URLs did not return 200.")
@@ -0,0 +1,172 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+MAX_REDIRECTS = 3
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+USER_AGENT = "kidhub-media-fetch/1.0"
+_CHUNK_SIZE = 64 * 1024
+
+
+class MediaFetchError(Exception):
+    pass
+
+
+def media_filename(url: str, fallback_name: str) -> str:
+    filename = urlsplit(url).path.rsplit("/", 1)[-1] or fallback_name
+    if "." not in filename:
+        filename = fallback_name
+    return filename
+
+
+class MediaFetcher:
+    def __init__(self, max_workers=None, timeout=None, max_bytes=None, deadline=None):
+        self.max_workers = max_workers or settings.MEDIA_FETCH_WORKERS
+        self.timeout = timeout or settings.MEDIA_FETCH_TIMEOUT
+        self.max_bytes = max_bytes or settings.MEDIA_FETCH_MAX_BYTES
+        self.deadline = deadline or settings.MEDIA_FETCH_DEADLINE
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def _get_connection(self, scheme, netloc):
+        pool = getattr(self._local, "connections", None)
+        if pool is None:
+            pool = self._local.connections = {}
+        conn = pool.get((scheme, netloc))
+        if conn is None:
+            connection_class = HTTPSConnection if scheme == "https" else HTTPConnection
+            conn = connection_class(netloc, timeout=self.timeout)
+            pool[(scheme, netloc)] = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _failed(self, url, exc, deadline) -> MediaFetchError:
+        if time.monotonic() >= deadline:
+            return MediaFetchError(f"{url} took longer than {self.deadline} seconds.")
+        return MediaFetchError(f"Failed to fetch {url}: {exc}")
+
+    def _socket_timeout(self, url, conn, deadline) -> float:
+        # The socket timeout only bounds each read; a server trickling bytes
+        # could hold a worker far longer without the overall deadline.
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            conn.close()
+            raise self._failed(url, None, deadline)
+        return min(self.timeout, remaining)
+
+    def _send(self, url, deadline):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise MediaFetchError(f"Unsupported media URL: {url}")
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        conn = self._get_connection(parts.scheme, parts.netloc)
+        while True:
+            # The server may have dropped a pooled keep-alive socket since its
+            # last use, so a failure on a reused socket is retried once fresh.
+            reused = conn.sock is not None
+            conn.timeout = self._socket_timeout(url, conn, deadline)
+            if reused:
+                conn.sock.settimeout(conn.timeout)
+            try:
+                conn.request("GET", path, headers={"User-Agent": USER_AGENT})
+                # The response may close the connection, so keep the socket
+                # to adjust its timeout while the body is read.
+                sock = conn.sock
+                return conn, sock, conn.getresponse()
+            except (HTTPException, OSError) as exc:
+                conn.close()
+                if not reused:
+                    raise self._failed(url, exc, deadline) from exc
+
+    def _read_body(self, url, conn, sock, response, deadline):
+        length = response.getheader("Content-Length")
+        if length and length.isdecimal() and int(length) > self.max_bytes:
+            conn.close()
+            raise MediaFetchError(f"{url} exceeds {self.max_bytes} bytes.")
+
+        chunks = []
+        size = 0
+        try:
+            while True:
+                sock.settimeout(self._socket_timeout(url, conn, deadline))
+                # read1 returns after a single receive, so the deadline is
+                # checked between them.
+                chunk = response.read1(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_bytes:
+                    conn.close()
+                    raise MediaFetchError(f"{url} exceeds {self.max_bytes} bytes.")
+                chunks.append(chunk)
+        except (HTTPException, OSError) as exc:
+            conn.close()
+            raise self._failed(url, exc, deadline) from exc
+        return b"".join(chunks)
+
+    def fetch(self, url: str) -> bytes:
+        # One deadline covers the whole fetch, redirects included.
+        deadline = time.monotonic() + self.deadline
+        for _ in range(MAX_REDIRECTS + 1):
+            conn, sock, response = self._send(url, deadline)
+            if response.status in REDIRECT_STATUSES:
+                location = response.getheader("Location")
+                self._read_body(url, conn, sock, response, deadline)
+                if not location:
+                    raise MediaFetchError(f"{url} redirected without a location.")
+                url = urljoin(url, location)
+                continue
+            body = self._read_body(url, conn, sock, response, deadline)
+            if response.status != 200:
+                raise MediaFetchError(f"{url} returned HTTP {response.status}.")
+            return body
+        raise MediaFetchError(f"Too many redirects for {url}.")
+
+    def _fetch_or_error(self, url):
+        try:
+            return self.fetch(url)
+        except MediaFetchError as exc:
+            return exc
+
+    def fetch_all(self, urls) -> dict[str, bytes | MediaFetchError]:
+        unique = list(dict.fromkeys(url for url in urls if url))
+        if not unique:
+            return {}
+        workers = min(self.max_workers, len(unique))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(unique, pool.map(self._fetch_or_error, unique)))
+
+
+def prefetched_content_file(
+    results, url: str, fallback_name: str
+) -> tuple[ContentFile, str]:
+    content = results.get(url)
+    if content is None:
+        with MediaFetcher() as fetcher:
+            content = fetcher.fetch(url)
+    if isinstance(content, MediaFetchError):
+        raise content
+    return ContentFile(content), media_filename(url, fallback_name)
+
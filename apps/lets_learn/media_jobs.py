@@ -0,0 +1,123 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .atlases import AtlasBuilder
+from .audio_bundles import AudioBundleBuilder
+from .caching import invalidate_categories, invalidate_items
+from .changelog import record_changes
+from .derivatives import render_variants, variants_current
+from .models import CategoryConfig, ChangeLogEntry, LearnItem
+from .packs import PackBuilder
+
+# Image field, variants field and category field per model.
+VARIANT_FIELDS = {
+    LearnItem: ("object_image", "object_image_variants", "category_id"),
+    CategoryConfig: ("image", "image_variants", "category"),
+}
+CATEGORY_ASSET_BUILDERS = (AtlasBuilder, AudioBundleBuilder, PackBuilder)
+DERIVATIVE_WORKERS = 2
+# Saves only queue the work: derivatives and category assets are rendered off
+# the request after the row commits, and clients get the original image and
+# the previous asset build until then.
+_executor = ThreadPoolExecutor(
+    max_workers=DERIVATIVE_WORKERS, thread_name_prefix="lets-learn-derivatives"
+)
+# Categories with an asset rebuild queued but not started yet.
+_pending_categories = set()
+_pending_lock = threading.Lock()
+
+
+def record_derived(model, pk, field, derived_field, name, category, derived, source):
+    with transaction.atomic():
+        # Guard on the source name so a concurrent upload is never overwritten.
+        updated = model.objects.filter(pk=pk, **{field: name}).update(
+            **{derived_field: derived},
+            version=F("version") + 1,
+            updated_at=timezone.now(),
+        )
+        if updated:
+            object_type = (
+                ChangeLogEntry.ObjectType.CATEGORY
+                if model is CategoryConfig
+                else ChangeLogEntry.ObjectType.ITEM
+            )
+            change = {
+                "object_type": object_type,
+                "object_id": pk,
+                "action": ChangeLogEntry.Action.UPDATED,
+                "category": category,
+                "version": model.objects.values_list("version", flat=True).get(pk=pk),
+            }
+            record_changes([change], source)
+    return updated
+
+
+def _build_variants(model, pk, name, category, source):
+    field, variants_field, _ = VARIANT_FIELDS[model]
+    widths = sorted(settings.IMAGE_DERIVATIVE_WIDTHS)
+    try:
+        try:
+            variants = render_variants(name, widths)[0]
+        except OSError:
+            # A missing or unreadable source is recorded as having no
+            # variants; backfill_media --force retries it.
+            variants = {"source": name, "widths": widths, "variants": []}
+        if record_derived(
+            model,
+            pk,
+            field,
+            variants_field,
+            name,
+            category,
+            variants,
+            source,
+        ):
+            if model is CategoryConfig:
+                invalidate_categories({category})
+            else:
+                invalidate_items({category})
+                # Atlases are tiled from the variants.
+                schedule_category_assets({category})
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(instance, source) -> None:
+    model = type(instance)
+    field, variants_field, category_field = VARIANT_FIELDS[model]
+    name = getattr(instance, field).name
+    if not name or variants_current(getattr(instance, variants_field), name):
+        return
+    args = (model, instance.pk, name, getattr(instance, category_field), source)
+    transaction.on_commit(lambda: _executor.submit(_build_variants, *args))
+
+
+def _build_category_assets(category):
+    with _pending_lock:
+        _pending_categories.discard(category)
+    try:
+        for builder_class in CATEGORY_ASSET_BUILDERS:
+            # Every save writes new files, so superseded ones are pruned here.
+            builder_class().build([category], prune=True)
+    finally:
+        close_old_connections()
+
+
+def schedule_category_assets(categories) -> None:
+    categories = {category for category in categories if category is not None}
+
+    def submit():
+        for category in categories:
+            with _pending_lock:
+                if category in _pending_categories:
+                    continue
+                _pending_categories.add(category)
+            _executor.submit(_build_category_assets, category)
+
+    if categories:
+        transaction.on_commit(submit)
@@ -0,0 +1,34 @@
+from django.core.files.storage import default_storage
+from django.db import migrations, transaction
+
+
+def clear_generated_color_images(apps, schema_editor):
+    LearnItem = apps.get_model('lets_learn', 'LearnItem')
+    items = (
+        LearnItem.objects.exclude(object_color__isnull=True)
+        .exclude(object_color='')
+        .exclude(object_image__isnull=True)
+        .exclude(object_image='')
+    )
+    # A colour item could only carry an image generated from its colour, so
+    # nothing else points at these files.
+    names = list(items.values_list('object_image', flat=True))
+    items.update(object_image='')
+
+    def delete_files():
+        for name in names:
+            if default_storage.exists(name):
+                default_storage.delete(name)
+
+    transaction.on_commit(delete_files, using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lets_learn', '0013_track_content_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_generated_color_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-16 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lets_learn', '0014_color_items_use_swatches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoryconfig',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='learnitem',
+            name='object_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
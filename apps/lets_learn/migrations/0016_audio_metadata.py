@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-16 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lets_learn', '0015_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learnitem',
+            name='audio_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
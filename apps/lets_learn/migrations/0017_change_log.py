@@ -0,0 +1,45 @@
+# Generated by Django 6.1.2 on 2026-10-16 22:44
+
+from django.db import migrations, models
+
+
+def create_sequence_row(apps, schema_editor):
+    ChangeLogSequence = apps.get_model('lets_learn', 'ChangeLogSequence')
+    ChangeLogSequence.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lets_learn', '0016_audio_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveBigIntegerField(unique=True)),
+                ('object_type', models.CharField(choices=[('item', 'Learn item'), ('category', 'Category')], max_length=16)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=16)),
+                ('category', models.IntegerField(null=True)),
+                ('previous_category', models.IntegerField(null=True)),
+                ('version', models.PositiveIntegerField(null=True)),
+                ('source', models.CharField(choices=[('model', 'Model save or delete'), ('import', 'Spreadsheet import'), ('backfill', 'Media backfill')], max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['sequence'],
+                'indexes': [models.Index(fields=['category', 'sequence'], name='lets_learn__categor_db39f7_idx')],
+            },
+        ),
+        migrations.RunPython(create_sequence_row, migrations.RunPython.noop),
+    ]
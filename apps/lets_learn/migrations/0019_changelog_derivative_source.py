@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lets_learn', '0018_throttle_counter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='changelogentry',
+            name='source',
+            field=models.CharField(choices=[('model', 'Model save or delete'), ('import', 'Spreadsheet import'), ('backfill', 'Media backfill'), ('derivative', 'Derivative rendering')], max_length=16),
+        ),
+    ]
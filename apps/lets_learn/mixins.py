@@ -1,4 +1,5 @@
 import os
+import time
 
 from drf_excel.mixins import XLSXFileMixin
 from drf_excel.renderers import XLSXRenderer
@@ -8,6 +9,21 @@ from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from .exporters import (
+    EXPORT_CHUNK_SIZE,
+    CSVRenderer,
+    NDJSONRenderer,
+    export_headers,
+    iter_export_rows,
+    stream_csv,
+    stream_ndjson,
+    stream_xlsx,
+)
+
+IMPORT_MODE_ROW = "row"
+IMPORT_MODE_BULK = "bulk"
+IMPORT_MODES = {IMPORT_MODE_ROW, IMPORT_MODE_BULK}
+
 
 def header_map(values) -> dict[str, int]:
     return {
@@ -17,6 +33,27 @@ def header_map(values) -> dict[str, int]:
     }
 
 
+def row_value(row, header_mapping, name):
+    idx = header_mapping.get(name)
+    if idx is None or idx >= len(row):
+        return None
+    value = row[idx]
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def tally_import_results(results) -> dict[str, int]:
+    counts = {"created": 0, "updated": 0, "skipped": 0}
+    for result in results:
+        if result in ("created", "updated"):
+            counts[result] += 1
+        else:
+            counts["skipped"] += 1
+    return counts
+
+
 class XlsxImportSerializer(serializers.Serializer):
     xlsx_file = serializers.FileField()
 
@@ -27,6 +64,8 @@ class XlsxExportImportMixin(XLSXFileMixin):
     filename = "export.xlsx"
     import_required_headers = []
     import_expected_filename = None
+    import_mode = IMPORT_MODE_ROW
+    export_chunk_size = EXPORT_CHUNK_SIZE
 
     def get_export_serializer_class(self):
         if self.export_serializer_class is None:
@@ -35,14 +74,41 @@ class XlsxExportImportMixin(XLSXFileMixin):
             )
         return self.export_serializer_class
 
+    def iter_export_rows(self, serializer):
+        queryset = self.filter_queryset(self.get_queryset())
+        return iter_export_rows(queryset, serializer, self.export_chunk_size)
+
     def get_serializer_class(self):
         if getattr(self, "action", None) == "import_xlsx":
             return self.import_serializer_class
         return super().get_serializer_class()
 
+    def get_import_expected_filename(self, request):
+        return self.import_expected_filename
+
+    def get_import_required_headers(self):
+        return list(self.import_required_headers)
+
+    def get_import_mode(self, request):
+        mode = (request.query_params.get("mode") or self.import_mode).lower()
+        if mode not in IMPORT_MODES:
+            return self.import_mode
+        return mode
+
+    def get_import_row_value(self, row, header_mapping, name):
+        return row_value(row, header_mapping, name)
+
     def handle_import_row(self, row, header_mapping):
         raise NotImplementedError
 
+    def handle_import_rows(self, rows, header_mapping):
+        return tally_import_results(
+            self.handle_import_row(row, header_mapping) for row in rows
+        )
+
+    def handle_bulk_import(self, rows, header_mapping):
+        return self.handle_import_rows(rows, header_mapping)
+
     @action(
         detail=False,
         methods=["get"],
@@ -51,13 +117,44 @@ class XlsxExportImportMixin(XLSXFileMixin):
         url_path="export-xlsx",
     )
     def export_xlsx(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_export_serializer_class()(
-            queryset,
-            many=True,
-            context={"request": request},
+        serializer = self.get_export_serializer_class()(context={"request": request})
+        return stream_xlsx(
+            self.iter_export_rows(serializer),
+            export_headers(serializer),
+            self.get_filename(request),
+            request,
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAdminUser],
+        renderer_classes=[NDJSONRenderer],
+        url_path="export-ndjson",
+    )
+    def export_ndjson(self, request):
+        serializer = self.get_export_serializer_class()(context={"request": request})
+        return stream_ndjson(
+            self.iter_export_rows(serializer),
+            self.get_filename(request),
+            request,
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAdminUser],
+        renderer_classes=[CSVRenderer],
+        url_path="export-csv",
+    )
+    def export_csv(self, request):
+        serializer = self.get_export_serializer_class()(context={"request": request})
+        return stream_csv(
+            self.iter_export_rows(serializer),
+            export_headers(serializer),
+            self.get_filename(request),
+            request,
         )
-        return Response(serializer.data)
 
     @action(
         detail=False,
@@ -73,7 +170,7 @@ class XlsxExportImportMixin(XLSXFileMixin):
         serializer.is_valid(raise_exception=True)
         upload = serializer.validated_data["xlsx_file"]
 
-        expected_filename = self.import_expected_filename
+        expected_filename = self.get_import_expected_filename(request)
 
         if expected_filename:
             actual_name = os.path.basename(upload.name or "")
@@ -83,27 +180,28 @@ class XlsxExportImportMixin(XLSXFileMixin):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        wb = load_workbook(upload)
-        ws = wb.active
-        header_mapping = header_map([cell.value for cell in ws[1]])
-        required = self.import_required_headers
+        wb = load_workbook(upload, read_only=True, data_only=True)
+        rows = wb.active.iter_rows(values_only=True)
+        header_mapping = header_map(next(rows, ()))
+        required = self.get_import_required_headers()
         missing = [name for name in required if name not in header_mapping]
         if missing:
+            wb.close()
             return Response(
                 {"detail": f"Missing columns: {', '.join(missing)}."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        created = 0
-        updated = 0
-        skipped = 0
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            result = self.handle_import_row(row, header_mapping)
-            if result == "created":
-                created += 1
-            elif result == "updated":
-                updated += 1
+        started = time.perf_counter()
+        try:
+            if self.get_import_mode(request) == IMPORT_MODE_BULK:
+                counts = self.handle_bulk_import(rows, header_mapping)
             else:
-                skipped += 1
-
-        return Response({"created": created, "updated": updated, "skipped": skipped})
+                counts = self.handle_import_rows(rows, header_mapping)
+        finally:
+            wb.close()
+        elapsed = time.perf_counter() - started
+
+        total = sum(counts.values())
+        counts["rows_per_second"] = round(total / elapsed, 1) if elapsed else None
+        return Response(counts)
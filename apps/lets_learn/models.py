@@ -1,8 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils.text import slugify
 
+from .audio_metadata import audio_metadata_current, read_audio_metadata
+from .derivatives import variants_current
 from .services import (
-    generate_color_image,
     get_category_translation,
     normalize_color,
     validate_object_fields,
@@ -39,6 +40,9 @@ class CategoryConfig(models.Model):
     name_hi = models.CharField(max_length=255, blank=True, null=True)
     slug = models.SlugField(max_length=255, blank=True, allow_unicode=True)
     image = models.ImageField(upload_to='categories/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1, editable=False)
 
     class Meta:
         verbose_name_plural = "Categories"
@@ -56,7 +60,14 @@ class CategoryConfig(models.Model):
                 if not self.name_hi and translated_hi:
                     self.name_hi = translated_hi
             self.slug = slugify(self.name, allow_unicode=True)
-        super().save(*args, **kwargs)
+        # Outdated variants are dropped; media_jobs renders new ones on commit.
+        if not variants_current(self.image_variants, self.image.name):
+            self.image_variants = {}
+        if not self._state.adding:
+            self.version += 1
+        # The change-log entry is written by post_save and must commit with the row.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 class LearnItem(models.Model):
     category = models.ForeignKey(
@@ -70,10 +81,15 @@ class LearnItem(models.Model):
     slug = models.SlugField(max_length=120, blank=True, allow_unicode=True)
     content_name = models.TextField(blank=True, null=True)
     object_image = models.ImageField(upload_to='learn_items/objects/', blank=True, null=True)
+    object_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     object_color = models.CharField(max_length=7, blank=True, null=True)
     audio = models.FileField(upload_to='learn_items/audio/', blank=True, null=True)
+    audio_metadata = models.JSONField(default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1, editable=False)
 
+    loaded_category_id = None
 
     class Meta:
         ordering = ['order']
@@ -81,32 +97,102 @@ class LearnItem(models.Model):
             models.Index(fields=['category', 'order']),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_category_id = instance.__dict__.get("category_id")
+        return instance
+
     def __str__(self):
         category_name = self.category.name if self.category_id else None
         fallback = str(self.category_id) if self.category_id is not None else "Unknown"
         return f"{category_name or fallback} - {self.name}"
 
+    def clean_fields(self, exclude=None):
+        # Imported here because registry imports this module.
+        from .registry import request_categories
+
+        exclude = set(exclude or ())
+        if "category" in exclude or request_categories().get(self.category_id) is None:
+            return super().clean_fields(exclude=exclude)
+        # A category the registry knows skips ForeignKey.validate's SELECT.
+        # Missing, unknown or just-created categories take the default path.
+        return super().clean_fields(exclude=exclude | {"category"})
+
     def clean(self):
         super().clean()
         validate_object_fields(self.object_image, self.object_color)
 
+    def populate_derived_fields(self):
+        if self.name:
+            self.slug = slugify(self.name, allow_unicode=True)
+        if self.object_color:
+            self.object_color = normalize_color(self.object_color)
+        # Outdated variants are dropped; media_jobs renders new ones on commit.
+        if not variants_current(self.object_image_variants, self.object_image.name):
+            self.object_image_variants = {}
+        if not audio_metadata_current(self.audio_metadata, self.audio.name):
+            self.audio_metadata = read_audio_metadata(self.audio)
+
     def save(self, *args, **kwargs):
         if self.name:
             self.slug = slugify(self.name, allow_unicode=True)
         self.full_clean()
-        if self.object_color:
-            normalized = normalize_color(self.object_color)
-            self.object_color = normalized
-
-            if not self.object_image:
-                safe_name = slugify(self.name) or "item"
-                filename = f"{safe_name}_{normalized[1:]}.png"
-                self.object_image.save(
-                    filename,
-                    generate_color_image(normalized),
-                    save=False,
-                )
-
-        super().save(*args, **kwargs)
-    
-    
\ No newline at end of file
+        self.populate_derived_fields()
+        if not self._state.adding:
+            self.version += 1
+        # The change-log entry is written by post_save and must commit with the row.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class ChangeLogEntry(models.Model):
+    class ObjectType(models.TextChoices):
+        ITEM = 'item', 'Learn item'
+        CATEGORY = 'category', 'Category'
+
+    class Action(models.TextChoices):
+        CREATED = 'created', 'Created'
+        UPDATED = 'updated', 'Updated'
+        DELETED = 'deleted', 'Deleted'
+
+    class Source(models.TextChoices):
+        MODEL = 'model', 'Model save or delete'
+        IMPORT = 'import', 'Spreadsheet import'
+        BACKFILL = 'backfill', 'Media backfill'
+        DERIVATIVE = 'derivative', 'Derivative rendering'
+
+    sequence = models.PositiveBigIntegerField(unique=True)
+    object_type = models.CharField(max_length=16, choices=ObjectType.choices)
+    object_id = models.PositiveBigIntegerField()
+    action = models.CharField(max_length=16, choices=Action.choices)
+    category = models.IntegerField(null=True)
+    previous_category = models.IntegerField(null=True)
+    version = models.PositiveIntegerField(null=True)
+    source = models.CharField(max_length=16, choices=Source.choices)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['sequence']
+        indexes = [
+            models.Index(fields=['category', 'sequence']),
+        ]
+
+    def __str__(self):
+        return f"#{self.sequence} {self.action} {self.object_type} {self.object_id}"
+
+
+class ChangeLogSequence(models.Model):
+    # Single row handing out sequence numbers. Its row lock is held until the
+    # writing transaction commits, so entries become visible in order.
+    value = models.PositiveBigIntegerField(default=0)
+
+
+class ThrottleCounter(models.Model):
+    # One row per rate-limit window or lock; see counters.DatabaseCounters.
+    key = models.CharField(max_length=255, unique=True)
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key}: {self.count}"
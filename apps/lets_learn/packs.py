@@ -0,0 +1,204 @@
+import hashlib
+import json
+import mimetypes
+import posixpath
+import zipfile
+from contextlib import ExitStack
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .category_assets import CategoryAssetBuilder
+from .models import CategoryConfig, LearnItem
+from .serializers import ALLOWED_LANGS, category_bundle
+from .snapshots import dumps_compact
+from .swatches import DEFAULT_SWATCH_EXTENSION, DEFAULT_SWATCH_SIZE, get_swatch, swatch_name
+
+PACK_DIR = "packs"
+PACK_MANIFEST_NAME = "manifest.json"
+
+
+def pack_manifest_name(category, version) -> str:
+    return f"{PACK_DIR}/{category}/manifests/{version}.json"
+
+
+def load_pack_manifest(category, version) -> dict | None:
+    name = pack_manifest_name(category, version)
+    if not default_storage.exists(name):
+        return None
+    with default_storage.open(name) as stored:
+        return json.load(stored)
+
+
+def _media_path(sha, source_name) -> str:
+    return posixpath.join("media", sha + posixpath.splitext(source_name)[1])
+
+
+def _media_sources(category, items):
+    # (owner, field, storage name, loader) for every file a pack ships.
+    sources = []
+    if category.image:
+        sources.append(("category", "image", category.image.name, None))
+    for item in items:
+        if item.object_image:
+            sources.append((item.pk, "object_image", item.object_image.name, None))
+        elif item.object_color:
+            name = swatch_name(item.object_color, DEFAULT_SWATCH_SIZE, DEFAULT_SWATCH_EXTENSION)
+            loader = lambda color=item.object_color: get_swatch(
+                color, DEFAULT_SWATCH_SIZE, DEFAULT_SWATCH_EXTENSION
+            )
+            sources.append((item.pk, "swatch", name, loader))
+        if item.audio:
+            sources.append((item.pk, "audio", item.audio.name, None))
+    return sources
+
+
+class PackBuilder(CategoryAssetBuilder):
+    asset_dir = PACK_DIR
+    map_filename = "pack.json"
+    file_extension = "zip"
+
+    def _previous_archive(self, previous, stack):
+        if not previous or self.force or not default_storage.exists(previous["file"]):
+            return None, {}
+        manifest = load_pack_manifest(previous["category"], previous["version"])
+        if manifest is None:
+            return None, {}
+        # Stored files are seekable, so only the members copied are read.
+        stored = stack.enter_context(default_storage.open(previous["file"], "rb"))
+        archive = stack.enter_context(zipfile.ZipFile(stored))
+        by_source = {entry["source"]: sha for sha, entry in manifest["media"].items()}
+        return archive, by_source
+
+    def build_category(self, category, previous=None) -> dict:
+        category = CategoryConfig.objects.prefetch_related(
+            Prefetch("items", queryset=LearnItem.objects.order_by("order", "id"))
+        ).get(pk=category.pk)
+        items = list(category.items.all())
+        version = previous["version"] + 1 if previous else 1
+        previous_files = ExitStack()
+        old_archive, old_sources = self._previous_archive(previous, previous_files)
+
+        buffer = BytesIO()
+        media = {}
+        item_entries = {str(item.pk): {"version": item.version, "media": {}} for item in items}
+        category_media = {}
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for owner, field, name, loader in _media_sources(category, items):
+                # Stored media names are never reused for new content, so a
+                # source seen in the previous pack can be copied from it.
+                sha = old_sources.get(name)
+                if sha is not None:
+                    content = old_archive.read(_media_path(sha, name))
+                elif loader is not None:
+                    content = loader()
+                else:
+                    with default_storage.open(name, "rb") as stored:
+                        content = stored.read()
+                if sha is None:
+                    sha = hashlib.sha256(content).hexdigest()
+                media_path = _media_path(sha, name)
+                if sha not in media:
+                    # Media is already compressed; deflating it again only costs CPU.
+                    archive.writestr(media_path, content, compress_type=zipfile.ZIP_STORED)
+                    media[sha] = {
+                        "path": media_path,
+                        "size": len(content),
+                        "source": name,
+                        "content_type": mimetypes.guess_type(name)[0],
+                    }
+                if owner == "category":
+                    category_media[field] = sha
+                else:
+                    item_entries[str(owner)]["media"][field] = sha
+
+            for lang in sorted(ALLOWED_LANGS):
+                data = category_bundle(category, {"request": None, "lang": lang})
+                archive.writestr(f"data/{lang}.json", dumps_compact(data))
+
+            manifest = {
+                "category": category.category,
+                "version": version,
+                "generated_at": timezone.now().isoformat(),
+                "languages": sorted(ALLOWED_LANGS),
+                "category_version": category.version,
+                "category_media": category_media,
+                "items": item_entries,
+                "media": media,
+            }
+            archive.writestr(PACK_MANIFEST_NAME, dumps_compact(manifest))
+
+        previous_files.close()
+        # Manifests outlive pruned archives so older devices can still sync.
+        manifest_name = pack_manifest_name(category.category, version)
+        if default_storage.exists(manifest_name):
+            default_storage.delete(manifest_name)
+        default_storage.save(manifest_name, ContentFile(dumps_compact(manifest)))
+        content = buffer.getvalue()
+        name, digest = self.write_file(category, content)
+        return {
+            "file": name,
+            "url": default_storage.url(name),
+            "hash": digest,
+            "size": len(content),
+            "category": category.category,
+            "version": version,
+            "item_count": len(items),
+        }
+
+    def read_data(self, entry) -> dict:
+        with default_storage.open(entry["file"], "rb") as stored:
+            with zipfile.ZipFile(stored) as archive:
+                return {
+                    lang: json.loads(archive.read(f"data/{lang}.json"))
+                    for lang in sorted(ALLOWED_LANGS)
+                }
+
+    def changes(self, entry, since) -> dict | None:
+        old = load_pack_manifest(entry["category"], since)
+        new = load_pack_manifest(entry["category"], entry["version"])
+        if old is None or new is None:
+            return None
+
+        old_items, new_items = old["items"], new["items"]
+        added = [pk for pk in new_items if pk not in old_items]
+        changed = [
+            pk
+            for pk in new_items
+            if pk in old_items and new_items[pk] != old_items[pk]
+        ]
+        deleted = [pk for pk in old_items if pk not in new_items]
+        category_changed = (
+            old["category_version"] != new["category_version"]
+            or old["category_media"] != new["category_media"]
+        )
+
+        languages = {}
+        wanted = set(added) | set(changed)
+        if wanted or category_changed:
+            for lang, data in self.read_data(entry).items():
+                languages[lang] = {
+                    "category": data["category"],
+                    "items": [item for item in data["items"] if str(item["id"]) in wanted],
+                }
+
+        return {
+            "from": since,
+            "to": entry["version"],
+            "added": [int(pk) for pk in added],
+            "changed": [int(pk) for pk in changed],
+            "deleted": [int(pk) for pk in deleted],
+            "category_changed": category_changed,
+            "languages": languages,
+            "media": {
+                "added": {
+                    sha: {**media, "url": default_storage.url(media["source"])}
+                    for sha, media in new["media"].items()
+                    if sha not in old["media"]
+                },
+                "removed": [sha for sha in old["media"] if sha not in new["media"]],
+            },
+        }
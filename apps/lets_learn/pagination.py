@@ -0,0 +1,108 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_filter(fields, values, lookup) -> Q:
+    condition = Q()
+    for index, field in enumerate(fields):
+        step = Q(**{f"{field}__{lookup}": values[index]})
+        for prev_field, prev_value in zip(fields[:index], values[:index]):
+            step &= Q(**{prev_field: prev_value})
+        condition |= step
+    return condition
+
+
+class KeysetPagination(CursorPagination):
+    ordering = ("id",)
+    page_size = 100
+    max_page_size = 500
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+    # Requests narrowed by one of these params are bounded already, so they
+    # keep the plain list response unless a cursor or page size is passed.
+    unpaginated_filter_params = ()
+
+    def should_paginate(self, request) -> bool:
+        params = request.query_params
+        if self.cursor_query_param in params or self.page_size_query_param in params:
+            return True
+        return not any(params.get(name) for name in self.unpaginated_filter_params)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            reverse, *values = json.loads(urlsafe_b64decode(encoded.encode()))
+        except (binascii.Error, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # Every ordering field is an integer column; anything else would reach
+        # the database as a type error instead of a 404.
+        if len(values) != len(self.ordering) or not all(
+            type(value) is int for value in [reverse, *values]
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), values
+
+    def encode_cursor(self, position):
+        reverse, values = position
+        encoded = urlsafe_b64encode(
+            json.dumps([int(reverse), *values], separators=(",", ":")).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position(self, instance):
+        if isinstance(instance, dict):
+            return [instance[field] for field in self.ordering]
+        return [getattr(instance, field) for field in self.ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.should_paginate(request):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.cursor_query_param
+        )
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor[0])
+
+        if self.cursor:
+            lookup = "lt" if reverse else "gt"
+            queryset = queryset.filter(keyset_filter(self.ordering, self.cursor[1], lookup))
+        order = [f"-{field}" if reverse else field for field in self.ordering]
+
+        results = list(queryset.order_by(*order)[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_previous = self.cursor is not None
+            self.has_next = has_more
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor((False, self._position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor((True, self._position(self.page[0])))
+
+
+class LearnItemPagination(KeysetPagination):
+    ordering = ("category_id", "order", "id")
+    unpaginated_filter_params = ("category",)
@@ -0,0 +1,68 @@
+import threading
+
+from .caching import CATALOGUE_SCOPE, get_versions
+from .models import CategoryConfig
+
+_REQUEST_ATTR = "_lets_learn_categories"
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CategoryIndex:
+    def __init__(self, version, categories):
+        self.version = version
+        self.categories = categories
+        self.by_category = {category.category: category for category in categories}
+        self.by_pk = {category.pk: category for category in categories}
+
+    def get(self, category):
+        return self.by_category.get(_to_int(category))
+
+    def get_by_pk(self, pk):
+        return self.by_pk.get(_to_int(pk))
+
+
+class CategoryRegistry:
+    # Every category write bumps the catalogue version (see signals), so the
+    # shared version key tells each process when its copy is stale. The
+    # instances are shared between requests and must be treated as read-only.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+
+    def current(self) -> CategoryIndex:
+        version = get_versions([CATALOGUE_SCOPE])[CATALOGUE_SCOPE]
+        index = self._index
+        if index is not None and index.version == version:
+            return index
+        with self._lock:
+            index = self._index
+            if index is None or index.version != version:
+                # Loaded after reading the version: a write committing in
+                # between bumps it again and forces another reload.
+                index = CategoryIndex(version, list(CategoryConfig.objects.all()))
+                self._index = index
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._index = None
+
+
+category_registry = CategoryRegistry()
+
+
+def request_categories(request=None) -> CategoryIndex:
+    # One version check per request, however many lookups it makes.
+    if request is None:
+        return category_registry.current()
+    index = getattr(request, _REQUEST_ATTR, None)
+    if index is None:
+        index = category_registry.current()
+        setattr(request, _REQUEST_ATTR, index)
+    return index
@@ -1,17 +1,43 @@
 from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils.encoding import filepath_to_uri, smart_str
 from rest_framework import serializers
 
-from .services import validate_object_fields
+from .services import ALLOWED_LANGS, DEFAULT_LANG, validate_object_fields
 from .models import CategoryConfig, LearnItem
+from .derivatives import variant_entries, variant_representation
+from .registry import request_categories
+from .swatches import swatch_url, swatch_url_builder
 
 
 _LANG_FIELD_MAP = {
     "ne": "name_ne",
     "hi": "name_hi",
 }
+# Item output field -> model columns it is rendered from.
+ITEM_FIELD_COLUMNS = {
+    "id": ("id",),
+    "category": ("category_id",),
+    "name": ("name",),
+    "slug": ("slug",),
+    "content_name": ("content_name",),
+    "object_image": ("object_image", "object_color"),
+    "object_image_variants": ("object_image_variants",),
+    "object_color": ("object_color",),
+    "audio": ("audio",),
+    "audio_metadata": ("audio_metadata",),
+    "order": ("order",),
+}
+# Always loaded: list pagination orders by them.
+ITEM_KEY_COLUMNS = ("id", "category_id", "order")
 
 
 class CategorySerializer(serializers.ModelSerializer):
+    image_variants = serializers.SerializerMethodField()
+
+    def get_image_variants(self, instance):
+        return variant_representation(self.context.get("request"), instance.image_variants)
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
         lang = (self.context.get("lang") or "en").lower()
@@ -25,7 +51,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CategoryConfig
-        fields = ["id", "name", "name_ne", "name_hi", "slug", "image"]
+        fields = ["id", "name", "name_ne", "name_hi", "slug", "image", "image_variants"]
         read_only_fields = ["slug"]
 
 
@@ -37,11 +63,68 @@ def _build_file_url(request, file_field):
     return file_field.url
 
 
+def media_url_builder(request, storage=default_storage):
+    # FileSystemStorage URLs are the base URL plus the quoted name, so the
+    # absolute prefix is resolved once instead of once per file.
+    if storage.__class__.url is FileSystemStorage.url and storage.base_url:
+        prefix = storage.url("")
+        if request:
+            prefix = request.build_absolute_uri(prefix)
+        return lambda name: prefix + filepath_to_uri(name).lstrip("/")
+    if request:
+        return lambda name: request.build_absolute_uri(storage.url(name))
+    return storage.url
+
+
+class CategoryField(serializers.SlugRelatedField):
+    # Resolved through the category registry instead of one query per value.
+    def __init__(self, **kwargs):
+        kwargs.setdefault("slug_field", "category")
+        kwargs.setdefault("queryset", CategoryConfig.objects.all())
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        # The foreign key targets CategoryConfig.category, so the column
+        # already holds the value to render.
+        return instance.category_id
+
+    def to_representation(self, value):
+        return value
+
+    def to_internal_value(self, data):
+        try:
+            value = int(data)
+        except (TypeError, ValueError):
+            self.fail("invalid")
+        category = request_categories(self.context.get("request")).by_category.get(value)
+        if category is None:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=smart_str(data))
+        return category
+
+
 class LearnItemSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
-        slug_field="category",
-        queryset=CategoryConfig.objects.all(),
-    )
+    category = CategoryField()
+    object_image_variants = serializers.SerializerMethodField()
+    audio_metadata = serializers.SerializerMethodField()
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def get_object_image_variants(self, instance):
+        return variant_representation(
+            self.context.get("request"), instance.object_image_variants
+        )
+
+    def get_audio_metadata(self, instance):
+        if not instance.audio_metadata:
+            return None
+        return {
+            key: instance.audio_metadata.get(key)
+            for key in ("duration", "size", "sha256", "content_type")
+        }
 
     def validate(self, attrs):
         attrs = super().validate(attrs)
@@ -55,6 +138,14 @@ class LearnItemSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if "object_image" in data and not data["object_image"] and instance.object_color:
+            data["object_image"] = swatch_url(
+                self.context.get("request"), instance.object_color
+            )
+        return data
+
     class Meta:
         model = LearnItem
         fields = [
@@ -64,13 +155,107 @@ class LearnItemSerializer(serializers.ModelSerializer):
             "slug",
             "content_name",
             "object_image",
+            "object_image_variants",
             "object_color",
             "audio",
+            "audio_metadata",
             "order",
         ]
         read_only_fields = ["slug"]
 
 
+def parse_item_fields(value):
+    # None means every field. Unknown names raise ValueError listing them.
+    requested = {name.strip() for name in (value or "").split(",") if name.strip()}
+    if not requested:
+        return None
+    unknown = requested - ITEM_FIELD_COLUMNS.keys()
+    if unknown:
+        raise ValueError(sorted(unknown))
+    return [name for name in LearnItemSerializer.Meta.fields if name in requested]
+
+
+def item_columns(fields) -> list[str]:
+    columns = dict.fromkeys(ITEM_KEY_COLUMNS)
+    for name in fields:
+        columns.update(dict.fromkeys(ITEM_FIELD_COLUMNS[name]))
+    return list(columns)
+
+
+class LearnItemReadSerializer:
+    # Read-only twin of LearnItemSerializer for .values() rows. Its output
+    # must stay identical, so change both together.
+    values_fields = (
+        "id",
+        "category_id",
+        "name",
+        "slug",
+        "content_name",
+        "object_image",
+        "object_image_variants",
+        "object_color",
+        "audio",
+        "audio_metadata",
+        "order",
+    )
+
+    def __init__(self, request=None, fields=None):
+        self.media_url = media_url_builder(request)
+        self.swatch_url = swatch_url_builder(request)
+        self.fields = fields
+        if fields is not None:
+            self.values_fields = item_columns(fields)
+
+    def _object_image(self, row):
+        object_image = self.media_url(row["object_image"]) if row["object_image"] else None
+        if not object_image and row["object_color"]:
+            object_image = self.swatch_url(row["object_color"])
+        return object_image
+
+    def _audio_metadata(self, row):
+        audio_metadata = row["audio_metadata"]
+        if not audio_metadata:
+            return None
+        return {
+            key: audio_metadata.get(key)
+            for key in ("duration", "size", "sha256", "content_type")
+        }
+
+    def _field_value(self, name, row):
+        if name == "category":
+            return row["category_id"]
+        if name == "object_image":
+            return self._object_image(row)
+        if name == "object_image_variants":
+            return variant_entries(row["object_image_variants"], self.media_url)
+        if name == "audio":
+            return self.media_url(row["audio"]) if row["audio"] else None
+        if name == "audio_metadata":
+            return self._audio_metadata(row)
+        return row[name]
+
+    def to_representation(self, row) -> dict:
+        if self.fields is not None:
+            return {name: self._field_value(name, row) for name in self.fields}
+        media_url = self.media_url
+        return {
+            "id": row["id"],
+            "category": row["category_id"],
+            "name": row["name"],
+            "slug": row["slug"],
+            "content_name": row["content_name"],
+            "object_image": self._object_image(row),
+            "object_image_variants": variant_entries(row["object_image_variants"], media_url),
+            "object_color": row["object_color"],
+            "audio": media_url(row["audio"]) if row["audio"] else None,
+            "audio_metadata": self._audio_metadata(row),
+            "order": row["order"],
+        }
+
+    def serialize(self, rows) -> list[dict]:
+        return [self.to_representation(row) for row in rows]
+
+
 class LearnItemExportSerializer(serializers.ModelSerializer):
     category = serializers.SerializerMethodField()
     object_image_url = serializers.SerializerMethodField()
@@ -97,3 +282,12 @@ class LearnItemExportSerializer(serializers.ModelSerializer):
 
     def get_audio_url(self, instance):
         return _build_file_url(self.context.get('request'), instance.audio)
+
+
+def category_bundle(category, context) -> dict:
+    return {
+        "category": CategorySerializer(category, context=context).data,
+        "items": LearnItemSerializer(
+            category.items.all(), many=True, context=context
+        ).data,
+    }
@@ -1,14 +1,13 @@
 import re
-from io import BytesIO
 
 from django.core.exceptions import ValidationError
-from django.core.files.base import ContentFile
-from PIL import Image
 
 
 _COLOR_RE = re.compile(r"^#?[0-9a-fA-F]{3}$|^#?[0-9a-fA-F]{6}$")
 _SHORT_HEX_LENGTH = 4
 _LONG_HEX_LENGTH = 7
+DEFAULT_LANG = "en"
+ALLOWED_LANGS = {"en", "ne", "hi"}
 
 CATEGORY_TRANSLATIONS = {
     "Your first alphabets": {"ne": "तिम्रा पहिलो अक्षरहरू", "hi": "आपके पहले अक्षर"},
@@ -28,6 +27,13 @@ CATEGORY_TRANSLATIONS = {
 }
 
 
+def request_lang(request) -> str:
+    lang = (request.query_params.get("lang") or DEFAULT_LANG).lower()
+    if lang not in ALLOWED_LANGS:
+        return DEFAULT_LANG
+    return lang
+
+
 def _ensure_hash(value: str) -> str:
     if value.startswith("#"):
         return value
@@ -51,13 +57,6 @@ def normalize_color(value: str) -> str:
     return value.lower()
 
 
-def generate_color_image(hex_color: str) -> ContentFile:
-    image = Image.new("RGB", (512, 512), hex_color)
-    buffer = BytesIO()
-    image.save(buffer, format="PNG")
-    return ContentFile(buffer.getvalue())
-
-
 def validate_object_fields(object_image, object_color) -> None:
     if object_image and object_color:
         raise ValidationError(
@@ -73,3 +72,4 @@ def get_category_translation(name: str) -> tuple[str | None, str | None]:
     if not translations:
         return None, None
     return translations.get("ne"), translations.get("hi")
+
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate_categories, invalidate_items
+from .changelog import category_change, item_change, record_changes
+from .media_jobs import schedule_category_assets, schedule_variants
+from .models import CategoryConfig, ChangeLogEntry, LearnItem
+
+Action = ChangeLogEntry.Action
+
+
+def _learn_item_changed(instance, action):
+    record_changes([item_change(instance, action)], ChangeLogEntry.Source.MODEL)
+    invalidate_items({instance.category_id, instance.loaded_category_id})
+    schedule_category_assets({instance.category_id, instance.loaded_category_id})
+    instance.loaded_category_id = instance.category_id
+
+
+def _category_changed(instance, action):
+    record_changes([category_change(instance, action)], ChangeLogEntry.Source.MODEL)
+    invalidate_categories({instance.category})
+    schedule_category_assets({instance.category})
+
+
+@receiver(post_save, sender=LearnItem)
+def learn_item_saved(sender, instance, created, **kwargs):
+    _learn_item_changed(instance, Action.CREATED if created else Action.UPDATED)
+    schedule_variants(instance, ChangeLogEntry.Source.DERIVATIVE)
+
+
+@receiver(post_delete, sender=LearnItem)
+def learn_item_deleted(sender, instance, **kwargs):
+    _learn_item_changed(instance, Action.DELETED)
+
+
+@receiver(post_save, sender=CategoryConfig)
+def category_saved(sender, instance, created, **kwargs):
+    _category_changed(instance, Action.CREATED if created else Action.UPDATED)
+    schedule_variants(instance, ChangeLogEntry.Source.DERIVATIVE)
+
+
+@receiver(post_delete, sender=CategoryConfig)
+def category_deleted(sender, instance, **kwargs):
+    _category_changed(instance, Action.DELETED)
@@ -0,0 +1,115 @@
+import hashlib
+import json
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .caching import content_stats
+from .models import CategoryConfig, LearnItem
+from .serializers import ALLOWED_LANGS, category_bundle
+
+SNAPSHOT_DIR = "snapshots"
+MANIFEST_NAME = f"{SNAPSHOT_DIR}/manifest.json"
+_HASH_LENGTH = 16
+
+
+class _SnapshotRequest:
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def build_absolute_uri(self, location):
+        return urljoin(self.base_url, location)
+
+
+def dumps_compact(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def load_manifest() -> dict:
+    if not default_storage.exists(MANIFEST_NAME):
+        return {"categories": {}}
+    with default_storage.open(MANIFEST_NAME) as manifest:
+        return json.load(manifest)
+
+
+def category_stamp(category) -> str:
+    stats = (
+        content_stats(CategoryConfig.objects.filter(pk=category.pk)),
+        content_stats(LearnItem.objects.filter(category=category)),
+    )
+    return hashlib.md5(repr(stats).encode(), usedforsecurity=False).hexdigest()
+
+
+def snapshot_path(manifest, category, lang):
+    entry = manifest["categories"].get(str(category))
+    if not entry:
+        return None
+    return entry["files"].get(lang)
+
+
+class SnapshotBuilder:
+    def __init__(self, base_url=None, force=False):
+        base_url = settings.SNAPSHOT_BASE_URL if base_url is None else base_url
+        self.context_request = _SnapshotRequest(base_url) if base_url else None
+        self.force = force
+
+    def _write(self, category, lang, data):
+        content = dumps_compact(data)
+        digest = hashlib.sha256(content).hexdigest()[:_HASH_LENGTH]
+        name = f"{SNAPSHOT_DIR}/{category.category}/{lang}.{digest}.json"
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(content))
+        return name, digest, len(content)
+
+    def build_category(self, category):
+        files = {}
+        hashes = {}
+        sizes = {}
+        for lang in sorted(ALLOWED_LANGS):
+            context = {"request": self.context_request, "lang": lang}
+            data = category_bundle(category, context)
+            files[lang], hashes[lang], sizes[lang] = self._write(category, lang, data)
+        urls = {lang: default_storage.url(name) for lang, name in files.items()}
+        return {"files": files, "urls": urls, "hashes": hashes, "sizes": sizes}
+
+    def build(self, categories=None) -> dict:
+        manifest = load_manifest()
+        queryset = CategoryConfig.objects.prefetch_related(
+            Prefetch("items", queryset=LearnItem.objects.order_by("order", "id"))
+        )
+        if categories:
+            queryset = queryset.filter(category__in=categories)
+
+        rebuilt = []
+        stale_files = []
+        for category in queryset:
+            key = str(category.category)
+            stamp = category_stamp(category)
+            previous = manifest["categories"].get(key)
+            if previous and previous["stamp"] == stamp and not self.force:
+                continue
+            entry = self.build_category(category)
+            entry["stamp"] = stamp
+            manifest["categories"][key] = entry
+            rebuilt.append(category.category)
+            if previous:
+                stale_files.extend(
+                    name
+                    for name in previous["files"].values()
+                    if name not in entry["files"].values()
+                )
+
+        if rebuilt or not default_storage.exists(MANIFEST_NAME):
+            manifest["generated_at"] = timezone.now().isoformat()
+            if default_storage.exists(MANIFEST_NAME):
+                default_storage.delete(MANIFEST_NAME)
+            default_storage.save(MANIFEST_NAME, ContentFile(dumps_compact(manifest)))
+        return {"rebuilt": rebuilt, "stale_files": stale_files, "manifest": manifest}
+
+    def prune(self, stale_files) -> None:
+        for name in stale_files:
+            default_storage.delete(name)
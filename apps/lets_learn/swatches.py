@@ -0,0 +1,91 @@
+import re
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image
+
+SWATCH_DIR = "swatches"
+DEFAULT_SWATCH_SIZE = 512
+DEFAULT_SWATCH_EXTENSION = "png"
+# Every stored size is kept for good, so only a few are offered.
+SWATCH_SIZES = (64, 128, 256, DEFAULT_SWATCH_SIZE, 1024)
+SWATCH_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+    "jpg": ("JPEG", "image/jpeg"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+# Alternative spellings share one stored file and cache entry.
+_EXTENSION_ALIASES = {"jpeg": "jpg"}
+_HEX_COLOR = re.compile(r"[0-9A-Fa-f]+")
+_CACHE_KEY = "lets-learn:swatch:{hex}:{size}:{extension}"
+
+
+def canonical_extension(extension: str) -> str:
+    return _EXTENSION_ALIASES.get(extension, extension)
+
+
+def swatch_name(hex_color: str, size: int, extension: str) -> str:
+    extension = canonical_extension(extension)
+    return f"{SWATCH_DIR}/{hex_color.lstrip('#')}/{size}.{extension}"
+
+
+def swatch_url(request, hex_color: str) -> str:
+    path = reverse(
+        "swatch",
+        kwargs={
+            "color": hex_color.lstrip("#"),
+            "extension": DEFAULT_SWATCH_EXTENSION,
+        },
+    )
+    if request:
+        return request.build_absolute_uri(path)
+    return path
+
+
+def swatch_url_builder(request):
+    # Resolve the route once; per-item reverse() dominates large list responses.
+    placeholder = "000000"
+    head, tail = swatch_url(request, placeholder).rsplit(placeholder, 1)
+
+    def build(hex_color):
+        color = hex_color.lstrip("#")
+        if _HEX_COLOR.fullmatch(color):
+            return f"{head}{color}{tail}"
+        return swatch_url(request, hex_color)
+
+    return build
+
+
+def render_swatch(hex_color: str, size: int, extension: str) -> bytes:
+    image_format = SWATCH_FORMATS[extension][0]
+    image = Image.new("RGB", (size, size), hex_color)
+    buffer = BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def get_swatch(hex_color: str, size: int, extension: str) -> bytes:
+    extension = canonical_extension(extension)
+    key = _CACHE_KEY.format(hex=hex_color.lstrip("#"), size=size, extension=extension)
+    content = cache.get(key)
+    if content is not None:
+        return content
+
+    name = swatch_name(hex_color, size, extension)
+    if default_storage.exists(name):
+        with default_storage.open(name) as stored:
+            content = stored.read()
+    else:
+        content = render_swatch(hex_color, size, extension)
+        saved_name = default_storage.save(name, ContentFile(content))
+        # A concurrent request may have stored the same swatch first; keep
+        # the canonical file and drop the renamed duplicate.
+        if saved_name != name:
+            default_storage.delete(saved_name)
+
+    cache.set(key, content, timeout=None)
+    return content
@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.lets_learn.audio_metadata import probe_audio
+
+# MPEG-1 layer III, 128 kbps, 44.1 kHz, stereo: 417-byte frames of 1152 samples.
+FRAME_HEADER = b"\xff\xfb\x90\x00"
+FRAME = FRAME_HEADER + b"\x00" * 413
+
+
+class ProbeAudioTests(SimpleTestCase):
+    def test_mp3_duration_from_frames(self):
+        metadata = probe_audio(FRAME * 10, "clip.mp3")
+        self.assertEqual(metadata["content_type"], "audio/mpeg")
+        self.assertEqual(metadata["duration"], round(10 * 1152 / 44100, 3))
+
+    def test_mp3_duration_from_xing_header(self):
+        xing = b"Xing" + (1).to_bytes(4, "big") + (100).to_bytes(4, "big")
+        first = FRAME_HEADER + b"\x00" * 32 + xing
+        data = first + b"\x00" * (417 - len(first)) + FRAME
+        self.assertEqual(
+            probe_audio(data, "clip.mp3")["duration"], round(100 * 1152 / 44100, 3)
+        )
+
+    @mock.patch("apps.lets_learn.audio_metadata.mutagen", None)
+    def test_truncated_vbr_header_has_no_duration(self):
+        for data in (
+            FRAME_HEADER + b"\x00" * 32 + b"Xing\x00\x00",
+            FRAME_HEADER + b"\x00" * 32 + b"Xing" + (1).to_bytes(4, "big") + b"\x00",
+            FRAME_HEADER + b"\x00" * 32 + b"VBRI\x00",
+        ):
+            with self.subTest(data=data):
+                metadata = probe_audio(data, "clip.mp3")
+                self.assertIsNone(metadata["duration"])
+                self.assertEqual(metadata["size"], len(data))
@@ -0,0 +1,59 @@
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.lets_learn.cache_backends import decode_value, encode_value
+from apps.lets_learn.caching import bump_versions, get_versions
+
+
+class FileCacheVersionTests(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        settings_override = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "apps.lets_learn.cache_backends.CompressedStatsCache",
+                    "LOCATION": self.location,
+                    "OPTIONS": {
+                        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                        "STATS_FLUSH_EVERY": 1,
+                    },
+                }
+            }
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_bumped_version_never_expires(self):
+        version = get_versions(["items"])["items"]
+        bump_versions(["items"])
+        self.assertEqual(get_versions(["items"])["items"], version + 1)
+
+        with mock.patch("time.time", return_value=time.time() + 86400):
+            self.assertEqual(get_versions(["items"])["items"], version + 1)
+
+    def test_stats_counters_never_expire(self):
+        cache.get("missing")
+        cache.get("missing")
+
+        with mock.patch("time.time", return_value=time.time() + 86400):
+            self.assertEqual(cache.get_stats()["misses"], 2)
+
+
+class EncodeValueTests(SimpleTestCase):
+    def test_bytes_are_stored_without_pickle_or_zlib(self):
+        body = b"\x1f\x8b" + bytes(range(256)) * 4
+        stored = encode_value(body)
+        self.assertEqual(stored[1:], body)
+        self.assertEqual(decode_value(stored), body)
+
+    def test_large_values_are_compressed(self):
+        value = {"content": "x" * 4096}
+        stored = encode_value(value)
+        self.assertLess(len(stored), 4096)
+        self.assertEqual(decode_value(stored), value)
@@ -0,0 +1,99 @@
+from django.test import TestCase
+
+from apps.lets_learn.importers import LearnItemBulkImporter
+from apps.lets_learn.models import CategoryConfig, ChangeLogEntry, LearnItem
+
+HEADERS = ["id", "category", "name", "content_name", "object_color", "order"]
+HEADER_MAPPING = {name: index for index, name in enumerate(HEADERS)}
+
+
+class LearnItemBulkImporterTests(TestCase):
+    def setUp(self):
+        self.colors = CategoryConfig.objects.get(category=8)
+        self.shapes = CategoryConfig.objects.get(category=14)
+        self.item = LearnItem.objects.create(
+            category=self.colors, name="Red", object_color="#ff0000", order=1
+        )
+
+    def run_import(self, *rows):
+        importer = LearnItemBulkImporter()
+        counts = importer.run([list(row) for row in rows], HEADER_MAPPING)
+        return importer, counts
+
+    def assertCounts(self, counts, created=0, updated=0, skipped=0):
+        self.assertEqual(
+            counts, {"created": created, "updated": updated, "skipped": skipped}
+        )
+
+    def test_creates_and_updates(self):
+        _, counts = self.run_import(
+            (None, 8, "Blue", None, "#00f", 2),
+            (self.item.pk, 8, "Crimson", None, "#dc143c", 1),
+        )
+        self.assertCounts(counts, created=1, updated=1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.name, "Crimson")
+        self.assertEqual(self.item.version, 2)
+        self.assertEqual(
+            LearnItem.objects.get(name="Blue").object_color, "#0000ff"
+        )
+
+    def test_unknown_category_is_skipped(self):
+        _, counts = self.run_import((None, 99, "Blue", None, "#0000ff", 2))
+        self.assertCounts(counts, skipped=1)
+        self.assertFalse(LearnItem.objects.filter(name="Blue").exists())
+
+    def test_bad_order_is_skipped(self):
+        _, counts = self.run_import(
+            (None, 8, "Blue", None, "#0000ff", "first"),
+            (self.item.pk, 8, "Crimson", None, "#dc143c", 1.5),
+        )
+        self.assertCounts(counts, skipped=2)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.name, "Red")
+
+    def test_bad_colour_is_skipped(self):
+        _, counts = self.run_import(
+            (None, 8, "Blue", None, "blue-ish", 2),
+            (self.item.pk, 8, "Red", None, "#gg0000", 1),
+        )
+        self.assertCounts(counts, skipped=2)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.object_color, "#ff0000")
+
+    def test_bad_id_is_skipped_not_created(self):
+        _, counts = self.run_import(
+            ("abc", 8, "Red", None, "#ff0000", 1),
+            (f"{self.item.pk}.5", 8, "Red", None, "#ff0000", 1),
+        )
+        self.assertCounts(counts, skipped=2)
+        self.assertEqual(LearnItem.objects.count(), 1)
+
+    def test_duplicate_ids_apply_in_sheet_order(self):
+        _, counts = self.run_import(
+            (self.item.pk, 8, "Crimson", None, "#dc143c", 1),
+            (self.item.pk, 8, "Scarlet", None, "#ff2400", 1),
+        )
+        self.assertCounts(counts, updated=2)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.name, "Scarlet")
+        self.assertEqual(self.item.version, 2)
+        self.assertEqual(
+            ChangeLogEntry.objects.filter(
+                object_id=self.item.pk, action=ChangeLogEntry.Action.UPDATED
+            ).count(),
+            1,
+        )
+
+    def test_item_changing_category(self):
+        importer, counts = self.run_import(
+            (self.item.pk, 14, "Red", None, "#ff0000", 1),
+        )
+        self.assertCounts(counts, updated=1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.category_id, self.shapes.category)
+        self.assertEqual(importer.affected_categories, {8, 14})
+        entry = ChangeLogEntry.objects.get(
+            object_id=self.item.pk, action=ChangeLogEntry.Action.UPDATED
+        )
+        self.assertEqual((entry.category, entry.previous_category), (14, 8))
@@ -0,0 +1,120 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from apps.lets_learn.media_fetch import MediaFetcher, MediaFetchError
+
+BODY = b"x" * 1000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        if self.path == "/image.png":
+            self._send_headers(len(BODY))
+            self.wfile.write(BODY)
+        elif self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/image.png")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path == "/large":
+            self._send_headers(len(BODY) * 10)
+            self.wfile.write(BODY * 10)
+        elif self.path == "/unsized":
+            # No Content-Length: the limit has to be enforced while reading.
+            self.send_response(200)
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(BODY * 10)
+            self.close_connection = True
+        elif self.path == "/stalled":
+            self._send_headers(len(BODY))
+            self.wfile.flush()
+            time.sleep(1)
+        elif self.path == "/trickle":
+            # Each byte arrives well within the socket timeout.
+            self._send_headers(len(BODY))
+            try:
+                for _ in range(40):
+                    self.wfile.write(b"x")
+                    self.wfile.flush()
+                    time.sleep(0.05)
+            except OSError:
+                pass
+            self.close_connection = True
+        else:
+            self.send_error(404)
+
+    def _send_headers(self, length):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+
+class MediaFetcherTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.server.daemon_threads = True
+        cls.server.connections = set()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.connections.clear()
+
+    def fetcher(self, **kwargs):
+        options = {"max_workers": 1, "timeout": 0.5, "max_bytes": 5000, "deadline": 1}
+        fetcher = MediaFetcher(**{**options, **kwargs})
+        self.addCleanup(fetcher.close)
+        return fetcher
+
+    def test_keep_alive_connection_is_reused(self):
+        fetcher = self.fetcher()
+        for _ in range(3):
+            self.assertEqual(fetcher.fetch(f"{self.base_url}/image.png"), BODY)
+        self.assertEqual(fetcher.fetch(f"{self.base_url}/redirect"), BODY)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_fetch_all_reports_errors_per_url(self):
+        results = self.fetcher(max_workers=2).fetch_all(
+            [f"{self.base_url}/image.png", f"{self.base_url}/missing.png", ""]
+        )
+        self.assertEqual(results[f"{self.base_url}/image.png"], BODY)
+        self.assertIsInstance(results[f"{self.base_url}/missing.png"], MediaFetchError)
+
+    def test_declared_length_over_limit(self):
+        with self.assertRaisesMessage(MediaFetchError, "exceeds 5000 bytes"):
+            self.fetcher().fetch(f"{self.base_url}/large")
+
+    def test_streamed_length_over_limit(self):
+        with self.assertRaisesMessage(MediaFetchError, "exceeds 5000 bytes"):
+            self.fetcher().fetch(f"{self.base_url}/unsized")
+
+    def test_socket_timeout(self):
+        started = time.monotonic()
+        with self.assertRaisesMessage(MediaFetchError, "Failed to fetch"):
+            self.fetcher(timeout=0.2, deadline=5).fetch(f"{self.base_url}/stalled")
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_deadline_covers_the_whole_fetch(self):
+        started = time.monotonic()
+        with self.assertRaisesMessage(MediaFetchError, "took longer than 0.5 seconds"):
+            self.fetcher(timeout=0.2, deadline=0.5).fetch(f"{self.base_url}/trickle")
+        self.assertLess(time.monotonic() - started, 1.5)
@@ -0,0 +1,37 @@
+from base64 import urlsafe_b64encode
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.lets_learn.pagination import LearnItemPagination
+
+
+def _cursor(payload: str) -> str:
+    return urlsafe_b64encode(payload.encode()).decode()
+
+
+class KeysetCursorTests(SimpleTestCase):
+    def decode(self, cursor):
+        request = Request(APIRequestFactory().get("/", {"cursor": cursor}))
+        return LearnItemPagination().decode_cursor(request)
+
+    def test_valid_cursor(self):
+        self.assertEqual(self.decode(_cursor("[1,2,3,4]")), (True, [2, 3, 4]))
+
+    def test_non_integer_values_are_not_found(self):
+        for payload in ('[0,"abc",1,2]', "[0,1.5,1,2]", "[0,null,1,2]", "[0,true,1,2]"):
+            with self.subTest(payload=payload):
+                with self.assertRaises(NotFound):
+                    self.decode(_cursor(payload))
+
+    def test_encoded_string_value_is_not_found(self):
+        with self.assertRaises(NotFound):
+            self.decode("WzAsImFiYyIsMSwyXQ==")
+
+    def test_malformed_cursors_are_not_found(self):
+        for cursor in ("not-base64!", _cursor("{}"), _cursor("[0,1]"), _cursor('"x"')):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(NotFound):
+                    self.decode(cursor)
@@ -0,0 +1,73 @@
+from rest_framework import throttling
+
+from .counters import shared_counters
+
+# Set on in-process requests such as cache warming. Clients cannot send it:
+# header-derived environ keys always start with HTTP_.
+UNTHROTTLED_ENVIRON_KEY = "lets_learn.unthrottled"
+
+
+class SlidingWindowRateThrottle(throttling.SimpleRateThrottle):
+    # Two counters per client instead of a list of timestamps: the previous
+    # fixed window is weighted by how much of it still overlaps the sliding
+    # window. Counters are incremented atomically in a store shared by every
+    # worker (THROTTLE_BACKEND).
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        super().__init__()
+        self.counters = shared_counters()
+
+    def allow_request(self, request, view):
+        if self.rate is None or request.META.get(UNTHROTTLED_ENVIRON_KEY):
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, offset = divmod(self.now, self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        # The window is read as "previous" for one more duration.
+        self.current, self.previous = self.counters.increment_and_get(
+            current_key, self.duration * 2, f"{self.key}:{int(window) - 1}"
+        )
+        self.weight = 1 - offset / self.duration
+        if self.previous * self.weight + self.current <= self.num_requests:
+            return True
+
+        # Rejected requests do not count against the client.
+        self.current -= 1
+        self.counters.decrement(current_key)
+        return self.throttle_failure()
+
+    def wait(self):
+        remaining = self.weight * self.duration
+        budget = self.num_requests - self.current - 1
+        if budget >= 0 and self.previous:
+            return max(0.0, (self.weight - budget / self.previous) * self.duration)
+        # This window is full on its own; wait until it has slid far enough
+        # into the next one.
+        budget = (self.num_requests - 1) / self.current if self.current else 1
+        return remaining + (1 - min(budget, 1)) * self.duration
+
+
+class AnonSlidingWindowThrottle(SlidingWindowRateThrottle, throttling.AnonRateThrottle):
+    pass
+
+
+class UserSlidingWindowThrottle(SlidingWindowRateThrottle, throttling.UserRateThrottle):
+    pass
+
+
+class SwatchRateThrottle(SlidingWindowRateThrottle):
+    # List responses link one swatch per item, so swatches get their own,
+    # larger budget per client instead of sharing the anon/user one.
+    scope = "swatch"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
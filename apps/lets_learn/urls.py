@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, LearnItemViewSet
+from .views import CategoryViewSet, ChangeLogView, LearnItemViewSet, SwatchView
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'items', LearnItemViewSet, basename='learnitem')
 
 urlpatterns = [
+    path('changes/', ChangeLogView.as_view(), name='change-log'),
+    path('swatches/<str:color>.<str:extension>', SwatchView.as_view(), name='swatch'),
     path('', include(router.urls)),
 ]
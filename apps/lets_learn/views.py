@@ -1,23 +1,56 @@
-from urllib.parse import urlparse
-from urllib.request import urlopen
-
-from django.conf import settings
-from django.core.files.base import ContentFile
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
 from django.utils.text import slugify
-from django.views.decorators.cache import cache_page
-from rest_framework import mixins, viewsets
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.views import APIView
 from rest_framework.permissions import BasePermission, SAFE_METHODS
-from .mixins import XlsxExportImportMixin
-from .models import CategoryConfig, LearnItem
+from rest_framework.response import Response
+from .atlases import AtlasBuilder
+from .audio_bundles import AudioBundleBuilder
+from .changelog import DEFAULT_READ_LIMIT, latest_sequence, read_changes
+from .caching import (
+    ALL_ITEMS_SCOPE,
+    CATALOGUE_SCOPE,
+    cache_response,
+    category_scope,
+    content_validators,
+    invalidate_items,
+)
+from .importers import LearnItemBulkImporter
+from .media_fetch import MediaFetcher, prefetched_content_file
+from .mixins import IMPORT_MODE_BULK, XlsxExportImportMixin
+from .models import CategoryConfig, ChangeLogEntry, LearnItem
+from .packs import PackBuilder
+from .pagination import LearnItemPagination
+from .registry import request_categories
+from .services import normalize_color, request_lang
+from .snapshots import load_manifest, snapshot_path
+from .swatches import (
+    DEFAULT_SWATCH_SIZE,
+    SWATCH_FORMATS,
+    SWATCH_SIZES,
+    get_swatch,
+)
 from .serializers import (
     CategorySerializer,
     LearnItemExportSerializer,
+    LearnItemReadSerializer,
     LearnItemSerializer,
+    category_bundle,
+    item_columns,
+    parse_item_fields,
 )
+from .throttling import SwatchRateThrottle
 
-DEFAULT_LANG = "en"
-ALLOWED_LANGS = {"en", "ne", "hi"}
+SWATCH_MAX_AGE = 365 * 24 * 60 * 60
 IMPORT_HEADERS_WITH_CATEGORY = ("category", "name")
 IMPORT_HEADERS_WITHOUT_CATEGORY = ("name",)
 FILTERSET_FIELDS = ["category"]
@@ -33,28 +66,11 @@ class AdminWriteOrReadOnly(BasePermission):
         )
 
 
-def _download_to_content_file(url: str, fallback_name: str) -> tuple[ContentFile, str]:
-    parsed = urlparse(url)
-    filename = parsed.path.rsplit("/", 1)[-1] or fallback_name
-    if "." not in filename:
-        filename = fallback_name
-    with urlopen(url) as response:
-        content = response.read()
-    return ContentFile(content), filename
-
-
 def _get_category_from_request(request):
     value = request.query_params.get("category")
     if not value:
         return None
-    return CategoryConfig.objects.filter(category=value).first()
-
-
-def _get_lang_from_request(request) -> str:
-    lang = (request.query_params.get("lang") or DEFAULT_LANG).lower()
-    if lang not in ALLOWED_LANGS:
-        return DEFAULT_LANG
-    return lang
+    return request_categories(request).get(value)
 
 
 def _category_filename(category, fallback):
@@ -64,21 +80,233 @@ def _category_filename(category, fallback):
     return f"{base}.xlsx"
 
 
-@method_decorator(cache_page(settings.CACHE_TTL), name="list")
-@method_decorator(cache_page(settings.CACHE_TTL), name="retrieve")
+class IgnoreAcceptNegotiation(BaseContentNegotiation):
+    # The response format comes from the URL, so image Accept headers such as
+    # "image/webp,image/*" must not turn into a 406; errors use the first renderer.
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class SwatchView(APIView):
+    permission_classes = []
+    throttle_classes = [SwatchRateThrottle]
+    content_negotiation_class = IgnoreAcceptNegotiation
+
+    def get(self, request, color, extension):
+        extension = extension.lower()
+        size = request.query_params.get("size") or str(DEFAULT_SWATCH_SIZE)
+        if extension not in SWATCH_FORMATS or size not in map(str, SWATCH_SIZES):
+            raise NotFound()
+        size = int(size)
+        try:
+            hex_color = normalize_color(color)
+        except ValidationError:
+            raise NotFound()
+
+        response = HttpResponse(
+            get_swatch(hex_color, size, extension),
+            content_type=SWATCH_FORMATS[extension][1],
+        )
+        patch_cache_control(response, public=True, max_age=SWATCH_MAX_AGE, immutable=True)
+        return response
+
+
+class ChangeLogView(APIView):
+    permission_classes = [AdminWriteOrReadOnly]
+
+    def get(self, request):
+        params = request.query_params
+        numbers = {}
+        for name, default in (("after", "0"), ("limit", str(DEFAULT_READ_LIMIT))):
+            value = params.get(name) or default
+            if not value.isdecimal():
+                return Response(
+                    {name: "Must be a non-negative integer."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            numbers[name] = int(value)
+        category = params.get("category")
+        if category and not category.isdecimal():
+            return Response(
+                {"category": "Must be a category number."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        object_type = params.get("type")
+        if object_type and object_type not in ChangeLogEntry.ObjectType.values:
+            return Response(
+                {"type": f"Must be one of {', '.join(ChangeLogEntry.ObjectType.values)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        latest = latest_sequence()
+        entries = read_changes(
+            after=numbers["after"],
+            limit=numbers["limit"],
+            category=int(category) if category else None,
+            object_type=object_type or None,
+        )
+        return Response(
+            {
+                "entries": entries,
+                "next_after": entries[-1]["sequence"] if entries else max(numbers["after"], latest),
+                "latest_sequence": latest,
+                "has_more": bool(entries) and entries[-1]["sequence"] < latest,
+            }
+        )
+
+
+@method_decorator(cache_response("categories"), name="list")
+@method_decorator(cache_response("category"), name="retrieve")
+@method_decorator(cache_response("category-bundle"), name="bundle")
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = CategoryConfig.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AdminWriteOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "bundle":
+            queryset = queryset.prefetch_related(
+                Prefetch("items", queryset=LearnItem.objects.order_by("order", "id"))
+            )
+        return queryset
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        context["lang"] = _get_lang_from_request(self.request)
+        context["lang"] = request_lang(self.request)
         return context
 
+    def get_object(self):
+        if self.action == "bundle":
+            return super().get_object()
+        category = request_categories(self.request).get_by_pk(self.kwargs["pk"])
+        if category is None:
+            raise NotFound()
+        self.check_object_permissions(self.request, category)
+        return category
+
+    def get_cache_scopes(self):
+        if self.action in {"retrieve", "bundle"}:
+            # Item and category writes both bump their category's scope.
+            category = request_categories(self.request).get_by_pk(self.kwargs["pk"])
+            if category is not None:
+                return [category_scope(category.category)]
+        return [CATALOGUE_SCOPE]
+
+    def get_conditional_validators(self, variant):
+        queryset = CategoryConfig.objects.all()
+        if self.action == "list":
+            return content_validators(variant, queryset)
+        pk = self.kwargs["pk"]
+        if not pk.isdecimal():
+            return None, None
+        if self.action == "bundle":
+            return content_validators(
+                variant,
+                queryset.filter(pk=pk),
+                LearnItem.objects.filter(category__pk=pk),
+            )
+        return content_validators(variant, queryset.filter(pk=pk), dated=True)
+
+    @action(detail=True, methods=["get"])
+    def bundle(self, request, pk=None):
+        category = self.get_object()
+        return Response(category_bundle(category, self.get_serializer_context()))
+
+    @action(detail=False, methods=["get"])
+    def snapshots(self, request):
+        return Response(load_manifest())
 
-@method_decorator(cache_page(settings.CACHE_TTL), name="list")
-@method_decorator(cache_page(settings.CACHE_TTL), name="retrieve")
+    @action(detail=True, methods=["get"])
+    def snapshot(self, request, pk=None):
+        category = self.get_object()
+        lang = request_lang(request)
+        manifest = load_manifest()
+        name = snapshot_path(manifest, category.category, lang)
+        if not name or not default_storage.exists(name):
+            raise NotFound("Snapshot has not been built.")
+
+        entry = manifest["categories"][str(category.category)]
+        etag = quote_etag(entry["hashes"][lang])
+        unconditional = HttpResponse(content_type="application/json")
+        unconditional["ETag"] = etag
+        conditional = get_conditional_response(request, etag=etag, response=unconditional)
+        if conditional is not unconditional:
+            return conditional
+
+        with default_storage.open(name) as snapshot:
+            response = HttpResponse(snapshot.read(), content_type="application/json")
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def _category_asset_response(self, request, builder, fields):
+        # Only the last build is served; media_jobs and the build_* commands
+        # rebuild assets after content changes.
+        entry = builder.load(self.get_object().category)
+        if entry is None:
+            raise NotFound("Asset is being built.")
+
+        etag = quote_etag(entry["stamp"])
+        unconditional = HttpResponse(content_type="application/json")
+        unconditional["ETag"] = etag
+        conditional = get_conditional_response(request, etag=etag, response=unconditional)
+        if conditional is not unconditional:
+            return conditional
+
+        data = {"url": request.build_absolute_uri(entry["url"])}
+        data.update((field, entry[field]) for field in fields)
+        response = Response(data)
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    @action(detail=True, methods=["get"])
+    def atlas(self, request, pk=None):
+        return self._category_asset_response(
+            request, AtlasBuilder(), ("width", "height", "tile", "items")
+        )
+
+    @action(detail=True, methods=["get"], url_path="audio-bundle")
+    def audio_bundle(self, request, pk=None):
+        return self._category_asset_response(
+            request, AudioBundleBuilder(), ("size", "items")
+        )
+
+    @action(detail=True, methods=["get"])
+    def pack(self, request, pk=None):
+        return self._category_asset_response(
+            request, PackBuilder(), ("version", "size", "hash", "item_count")
+        )
+
+    @action(detail=True, methods=["get"])
+    def changes(self, request, pk=None):
+        since = request.query_params.get("since", "")
+        if not since.isdecimal():
+            return Response(
+                {"since": "A pack version is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        builder = PackBuilder()
+        entry = builder.load(self.get_object().category)
+        if entry is None:
+            raise NotFound("Pack is being built.")
+        changes = builder.changes(entry, int(since))
+        if changes is None:
+            return Response(
+                {"detail": "Unknown pack version; download the full pack."},
+                status=status.HTTP_410_GONE,
+            )
+        for media in changes["media"]["added"].values():
+            media["url"] = request.build_absolute_uri(media["url"])
+        return Response(changes)
+
+
+@method_decorator(cache_response("items"), name="list")
+@method_decorator(cache_response("item"), name="retrieve")
 class LearnItemViewSet(
     XlsxExportImportMixin,
     mixins.CreateModelMixin,
@@ -90,12 +318,91 @@ class LearnItemViewSet(
     serializer_class = LearnItemSerializer
     export_serializer_class = LearnItemExportSerializer
     filename = "learn_items.xlsx"
+    import_mode = IMPORT_MODE_BULK
     filterset_fields = FILTERSET_FIELDS
+    pagination_class = LearnItemPagination
     permission_classes = [AdminWriteOrReadOnly]
+    fast_read_formats = {"json"}
+    requested_fields = None
+    _import_media = {}
+
+    def use_fast_read(self):
+        return self.request.accepted_renderer.format in self.fast_read_formats
+
+    def _parse_requested_fields(self):
+        try:
+            self.requested_fields = parse_item_fields(self.request.query_params.get("fields"))
+        except ValueError as exc:
+            return Response(
+                {"fields": f"Unknown fields: {', '.join(exc.args[0])}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.requested_fields is not None and not self.use_fast_read():
+            queryset = queryset.only(*item_columns(self.requested_fields))
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        # Only reads are trimmed; the browsable API's forms clone the request
+        # with a write method and keep every field.
+        if self.requested_fields is not None and self.request.method == "GET":
+            kwargs.setdefault("fields", self.requested_fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        error = self._parse_requested_fields()
+        if error is not None:
+            return error
+        if not self.use_fast_read():
+            return super().list(request, *args, **kwargs)
+        serializer = LearnItemReadSerializer(request, self.requested_fields)
+        rows = self.filter_queryset(self.get_queryset()).values(*serializer.values_fields)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        error = self._parse_requested_fields()
+        if error is not None:
+            return error
+        if not self.use_fast_read():
+            return super().retrieve(request, *args, **kwargs)
+        serializer = LearnItemReadSerializer(request, self.requested_fields)
+        try:
+            row = (
+                self.filter_queryset(self.get_queryset())
+                .filter(pk=kwargs["pk"])
+                .values(*serializer.values_fields)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            row = None
+        if row is None:
+            raise NotFound()
+        self.check_object_permissions(request, row)
+        return Response(serializer.to_representation(row))
 
     def _get_request_category(self):
         return _get_category_from_request(self.request)
 
+    def get_cache_scopes(self):
+        category = self.request.query_params.get("category")
+        if self.action == "list" and category and category.strip().isdecimal():
+            return [category_scope(int(category))]
+        return [ALL_ITEMS_SCOPE]
+
+    def get_conditional_validators(self, variant):
+        if self.action == "retrieve":
+            if not self.kwargs["pk"].isdecimal():
+                return None, None
+            queryset = self.get_queryset().filter(pk=self.kwargs["pk"])
+            return content_validators(variant, queryset, dated=True)
+        return content_validators(variant, self.filter_queryset(self.get_queryset()))
+
     def get_filename(self, request, *args, **kwargs):
         return _category_filename(self._get_request_category(), self.filename)
 
@@ -107,6 +414,16 @@ class LearnItemViewSet(
             return list(IMPORT_HEADERS_WITHOUT_CATEGORY)
         return list(IMPORT_HEADERS_WITH_CATEGORY)
 
+    def handle_import_rows(self, rows, header_mapping):
+        rows = list(rows)
+        urls = [
+            self.get_import_row_value(row, header_mapping, "object_image_url")
+            for row in rows
+        ]
+        with MediaFetcher() as fetcher:
+            self._import_media = fetcher.fetch_all(urls)
+        return super().handle_import_rows(rows, header_mapping)
+
     def handle_import_row(self, row, header_mapping):
         item_id = self.get_import_row_value(row, header_mapping, "id")
         category_value = self.get_import_row_value(row, header_mapping, "category")
@@ -127,9 +444,7 @@ class LearnItemViewSet(
             return "skipped"
 
         if category_value:
-            category = CategoryConfig.objects.filter(
-                category=int(category_value)
-            ).first()
+            category = request_categories(self.request).get(category_value)
             if not category:
                 return "skipped"
         else:
@@ -151,8 +466,8 @@ class LearnItemViewSet(
 
         if object_image_url:
             fallback = f"{slugify(name) or 'item'}.png"
-            content, filename = _download_to_content_file(
-                object_image_url, fallback
+            content, filename = prefetched_content_file(
+                self._import_media, object_image_url, fallback
             )
             item.object_image.save(filename, content, save=False)
             item.object_color = None
@@ -162,3 +477,11 @@ class LearnItemViewSet(
 
         item.save()
         return result
+
+    def handle_bulk_import(self, rows, header_mapping):
+        importer = LearnItemBulkImporter(
+            default_category=self._get_request_category(),
+        )
+        counts = importer.run(rows, header_mapping)
+        invalidate_items(importer.affected_categories)
+        return counts
@@ -0,0 +1,135 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import close_old_connections
+from django.urls import reverse
+
+from .models import LearnCategory
+from .registry import request_categories
+from .serializers import ALLOWED_LANGS
+from .throttling import UNTHROTTLED_ENVIRON_KEY
+
+WARM_FORMATS = ("json", "xlsx")
+DEFAULT_WARM_WORKERS = 4
+_STARTUP_LOCK_KEY = "lets-learn:warming-on-startup"
+_STARTUP_LOCK_TIMEOUT = 300
+
+
+def default_warm_host() -> str:
+    if settings.CACHE_WARM_HOST:
+        return settings.CACHE_WARM_HOST
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*" and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def _with_query(path, **params) -> str:
+    params = {key: value for key, value in params.items() if value}
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def warm_urls(categories=None, langs=None, formats=("json",)) -> list[str]:
+    categories = categories or LearnCategory.values
+    # The bare URL is kept too: clients on the default language omit lang.
+    langs = [""] + sorted(langs or ALLOWED_LANGS)
+    index = request_categories()
+    urls = []
+    for data_format in formats:
+        data_format = "" if data_format == "json" else data_format
+        for lang in langs:
+            urls.append(_with_query(reverse("category-list"), lang=lang, format=data_format))
+            for category in categories:
+                # Categories without a config have nothing to serve.
+                config = index.get(category)
+                if config is None:
+                    continue
+                urls.append(
+                    _with_query(
+                        reverse("category-detail", args=[config.pk]),
+                        lang=lang,
+                        format=data_format,
+                    )
+                )
+                urls.append(
+                    _with_query(
+                        reverse("learnitem-list"),
+                        category=category,
+                        lang=lang,
+                        format=data_format,
+                    )
+                )
+    return urls
+
+
+def _warm_environ(url, host, secure) -> dict:
+    path, _, query = url.partition("?")
+    return {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": host.partition(":")[0],
+        "SERVER_PORT": "443" if secure else "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": host,
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "https" if secure else "http",
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+        UNTHROTTLED_ENVIRON_KEY: True,
+    }
+
+
+def warm_cache(urls, host=None, secure=False, workers=DEFAULT_WARM_WORKERS):
+    # Cached responses vary by host and embed absolute URLs, so requests go
+    # through the middleware and views as the public host would see them.
+    host = host or default_warm_host()
+    handler = WSGIHandler()
+
+    def fetch(url):
+        statuses = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(int(status.split(" ", 1)[0]))
+
+        started = time.perf_counter()
+        response = handler(_warm_environ(url, host, secure), start_response)
+        try:
+            for _ in response:
+                pass
+        finally:
+            response.close()
+            close_old_connections()
+        return url, statuses[0], time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(fetch, urls))
+
+
+def warm_on_startup():
+    # Called from the WSGI/ASGI entry points. One process per deploy warms
+    # the shared cache; the others skip.
+    if not settings.CACHE_WARM_ON_STARTUP:
+        return
+    if not cache.add(_STARTUP_LOCK_KEY, True, _STARTUP_LOCK_TIMEOUT):
+        return
+
+    def run():
+        try:
+            warm_cache(warm_urls(), secure=settings.CACHE_WARM_SECURE)
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=run, daemon=True).start()
@@ -112,7 +112,7 @@ CORS_ALLOW_ALL_ORIGINS = os.getenv("CORS_ALLOW_ALL_ORIGINS", "False").lower() in
 # DRF
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "apps.lets_learn.renderers.FastJSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
         "drf_excel.renderers.XLSXRenderer",
     ],
@@ -120,24 +120,96 @@ REST_FRAMEWORK = {
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "apps.lets_learn.throttling.AnonSlidingWindowThrottle",
+        "apps.lets_learn.throttling.UserSlidingWindowThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": os.getenv("DRF_THROTTLE_ANON", "100/min"),
         "user": os.getenv("DRF_THROTTLE_USER", "1000/min"),
+        "swatch": os.getenv("DRF_THROTTLE_SWATCH", "600/min"),
     },
 }
 
-# Caching (local in-memory only)
-CACHE_TTL = int(os.getenv("CACHE_TTL", "900"))
+# Caching (shared by all worker processes unless CACHE_BACKEND=locmem)
+# Cached responses are invalidated by version bumps on every content change,
+# so entries can live for a long time.
+CACHE_TTL = int(os.getenv("CACHE_TTL", "86400"))
+# Expiries are shortened by up to this fraction so they do not line up.
+CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", "0.1"))
+# Outdated responses are kept this much longer and served while one request
+# regenerates them.
+CACHE_STALE_GRACE = int(os.getenv("CACHE_STALE_GRACE", "300"))
+# Pre-render the lets_learn responses when a server process starts (see
+# apps.lets_learn.warming). The host must match the one clients use.
+CACHE_WARM_ON_STARTUP = os.getenv("CACHE_WARM_ON_STARTUP", "False").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+CACHE_WARM_HOST = os.getenv("CACHE_WARM_HOST", "")
+CACHE_WARM_SECURE = os.getenv("CACHE_WARM_SECURE", "False").lower() in {"1", "true", "yes"}
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "lets_learn_cache"),
+    "file": (
+        "django.core.cache.backends.filebased.FileBasedCache",
+        str(BASE_DIR / ".cache" / "lets_learn"),
+    ),
+    "db": ("django.core.cache.backends.db.DatabaseCache", "lets_learn_cache"),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+}
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file").lower()
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ValueError(
+        f"CACHE_BACKEND must be one of: {', '.join(sorted(CACHE_BACKENDS))}."
+    )
+_cache_backend, _cache_location = CACHE_BACKENDS[CACHE_BACKEND]
+_cache_backend_options = {}
+if CACHE_BACKEND != "redis":
+    _cache_backend_options["MAX_ENTRIES"] = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "lets_learn_cache",
-    }
+        "BACKEND": "apps.lets_learn.cache_backends.CompressedStatsCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", _cache_location),
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "kidhub"),
+        "OPTIONS": {
+            "BACKEND": _cache_backend,
+            "BACKEND_OPTIONS": _cache_backend_options,
+            "MIN_COMPRESS_LENGTH": int(os.getenv("CACHE_MIN_COMPRESS_LENGTH", "512")),
+        },
+    },
 }
 
+# Rate-limit counters need an increment that is atomic across every worker:
+# "db" upserts a row in the default database (one statement per throttle
+# check, previous window included) and "redis" uses INCR. "locmem"
+# only counts within one process and is meant for development. The response
+# cache takes its regeneration locks from the same store.
+THROTTLE_BACKENDS = {
+    "db": None,
+    "redis": CACHE_BACKENDS["redis"],
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "lets_learn_throttle"),
+}
+THROTTLE_BACKEND = os.getenv("THROTTLE_BACKEND", "db").lower()
+if THROTTLE_BACKEND not in THROTTLE_BACKENDS:
+    raise ValueError(
+        f"THROTTLE_BACKEND must be one of: {', '.join(sorted(THROTTLE_BACKENDS))}."
+    )
+if THROTTLE_BACKENDS[THROTTLE_BACKEND]:
+    _throttle_backend, _throttle_location = THROTTLE_BACKENDS[THROTTLE_BACKEND]
+    CACHES["throttle"] = {
+        "BACKEND": _throttle_backend,
+        "LOCATION": os.getenv("THROTTLE_CACHE_LOCATION", _throttle_location),
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "kidhub"),
+    }
+
+# Remote media fetching for XLSX imports
+MEDIA_FETCH_WORKERS = int(os.getenv("MEDIA_FETCH_WORKERS", "8"))
+MEDIA_FETCH_TIMEOUT = float(os.getenv("MEDIA_FETCH_TIMEOUT", "10"))
+# Upper bound for one fetch, redirects included; the timeout above applies to
+# each socket operation.
+MEDIA_FETCH_DEADLINE = float(os.getenv("MEDIA_FETCH_DEADLINE", "30"))
+MEDIA_FETCH_MAX_BYTES = int(os.getenv("MEDIA_FETCH_MAX_BYTES", str(10 * 1024 * 1024)))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -177,3 +249,12 @@ STATIC_URL = 'static/'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = 'media/'
+
+# Widths of the resized WebP/JPEG variants generated for uploaded images.
+IMAGE_DERIVATIVE_WIDTHS = [
+    int(width)
+    for width in _env_list(os.getenv("IMAGE_DERIVATIVE_WIDTHS", "160,320,640,1280"))
+]
+
+# Absolute base used for media URLs inside prebuilt JSON snapshots.
+SNAPSHOT_BASE_URL = os.getenv("SNAPSHOT_BASE_URL", "")
@@ -16,3 +16,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
 application = WhiteNoise(application)
+
+from apps.lets_learn.warming import warm_on_startup  # noqa: E402
+
+warm_on_startup()